@@ -2,35 +2,170 @@ from flask import (
     Flask,
     request,
     jsonify,
-    render_template_string,
+    render_template,
     redirect,
     url_for,
     session,
+    g,
 )
 import webbrowser
+import csv
+import io
+import itertools
+import json
+import shutil
+import tempfile
 import threading
-import time
 import os
 import sqlite3
+import re
+import hashlib
+import hmac
+import functools
+import importlib.util
+from typing import Final
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from jinja2 import FileSystemBytecodeCache
+from markupsafe import Markup, escape
 from textblob import TextBlob
-import pandas as pd
+from textblob.en.sentiments import PatternAnalyzer
+
+try:
+    import ahocorasick
+except ImportError:  # optional: keyword matching falls back to a compiled regex
+    ahocorasick = None
+
+try:
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+except ImportError:  # optional: polarity falls back to TextBlob's PatternAnalyzer
+    SentimentIntensityAnalyzer = None
+
+try:
+    import orjson
+except ImportError:  # optional: API responses fall back to Flask's jsonify
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # optional: API responses are JSON only
+    msgpack = None
 
 
 app = Flask(__name__)
 app.secret_key = "replace-this-with-a-random-secret"
 
+# Static assets are cached by browsers for a year; static_url() adds a
+# content hash to their URLs so an edited file is fetched again.
+app.config["SEND_FILE_MAX_AGE_DEFAULT"] = 31536000
+
+# Drop the newline and indentation around {% %} tags so the nested
+# template blocks don't emit runs of blank lines on every render.
+app.jinja_options = {**app.jinja_options, "trim_blocks": True, "lstrip_blocks": True}
+
+# Compiled templates are cached on disk, so new worker processes skip the
+# Jinja compile step. With no directory given, Jinja uses a per-user
+# private folder under the system temp dir. Entries are keyed on the
+# template name and filename, and a checksum of the source decides whether
+# cached bytecode is stale. Neither changes with the environment options,
+# so change the pattern whenever the options above do.
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache(pattern="__jinja2_trim_%s.cache")
+
+
+@functools.lru_cache(maxsize=None)
+def _static_version(filename: str) -> str:
+    with open(os.path.join(app.static_folder, filename), "rb") as fh:
+        return hashlib.sha256(fh.read()).hexdigest()[:12]
+
+
+@app.template_global()
+def static_url(filename: str) -> str:
+    """URL for a file in static/, versioned by its content."""
+    return url_for("static", filename=filename, v=_static_version(filename))
+
+
+@app.after_request
+def _cache_static(response):
+    if request.endpoint == "static":
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+    return response
+
 
 # ---------- Simple SQLite-backed auth helpers (for assignment) ----------
 
-DB_PATH = os.path.join(os.path.dirname(__file__), "auth.db")
+# AUTH_DB_PATH points the app at another database, e.g. a scratch one in tests
+DB_PATH = os.environ.get("AUTH_DB_PATH") or os.path.join(os.path.dirname(__file__), "auth.db")
+
+# Applied once to every new connection. WAL lets readers (login checks)
+# run alongside the occasional signup write.
+DB_PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-8000",
+)
+
+# One connection per worker thread, reused across requests
+_db_local = threading.local()
 
 
 def _get_db():
-    conn = sqlite3.connect(DB_PATH)
-    conn.row_factory = sqlite3.Row
+    """
+    Return this thread's SQLite connection, opening it on first use.
+    sqlite3 keeps its own per-connection statement cache, so reusing the
+    connection also reuses the prepared SELECT used by validate_user.
+    """
+    conn = getattr(_db_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(DB_PATH, check_same_thread=False, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        for pragma in DB_PRAGMAS:
+            conn.execute(pragma)
+        _db_local.conn = conn
     return conn
 
 
+# scrypt cost parameters for stored password hashes
+SCRYPT_N = 16384
+SCRYPT_R = 8
+SCRYPT_P = 1
+_HASH_PREFIX = "scrypt$"
+
+# username -> sha256 of the last password that verified for it, so repeat
+# logins within this process skip both the SELECT and the scrypt work
+_VERIFIED_MAXSIZE = 1024
+_verified = OrderedDict()
+_verified_lock = threading.Lock()
+
+# username -> stored password hash, loaded at startup and kept in step with
+# signups so login checks normally never touch SQLite
+_user_cache = {}
+_user_cache_lock = threading.RLock()
+
+# Single background thread for auth writes that a request need not wait on
+_db_writer = ThreadPoolExecutor(max_workers=1)
+
+
+def _scrypt(password: str, salt: bytes) -> bytes:
+    return hashlib.scrypt(password.encode(), salt=salt, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P)
+
+
+def hash_password(password: str) -> str:
+    """Return a salted scrypt hash of the form 'scrypt$<salt hex>$<hash hex>'."""
+    salt = os.urandom(16)
+    return f"{_HASH_PREFIX}{salt.hex()}${_scrypt(password, salt).hex()}"
+
+
+def check_password(stored: str, password: str) -> bool:
+    """Constant-time check of password against a value from the users table."""
+    if not stored.startswith(_HASH_PREFIX):
+        # Accounts created before hashing was added hold the plain password
+        return hmac.compare_digest(stored.encode(), password.encode())
+    salt_hex, hash_hex = stored[len(_HASH_PREFIX):].split("$", 1)
+    return hmac.compare_digest(_scrypt(password, bytes.fromhex(salt_hex)).hex(), hash_hex)
+
+
 def init_auth_db():
     """Create users table if it does not exist."""
     with _get_db() as conn:
@@ -44,32 +179,91 @@ def init_auth_db():
             """
         )
         conn.commit()
+        users = conn.execute("SELECT username, password FROM users").fetchall()
+
+    with _user_cache_lock:
+        _user_cache.clear()
+        _user_cache.update((row["username"], row["password"]) for row in users)
+
+
+def _load_user(username: str):
+    """Return the stored password hash for username, or None if unknown."""
+    with _user_cache_lock:
+        stored = _user_cache.get(username)
+    if stored is not None:
+        return stored
+
+    # Not seen by this process yet, e.g. created by another server process
+    row = _get_db().execute(
+        "SELECT password FROM users WHERE username = ?", (username,)
+    ).fetchone()
+    if row is None:
+        return None
+    with _user_cache_lock:
+        _user_cache[username] = row["password"]
+    return row["password"]
+
+
+def create_users_bulk(pairs) -> int:
+    """
+    Insert many (username, password) pairs in a single transaction.
+    Blank entries and usernames that already exist are skipped.
+    Returns the number of users actually created.
+    """
+    rows = []
+    for username, password in pairs:
+        username = (username or "").strip()
+        if username and password:
+            rows.append((username, hash_password(password)))
+    if not rows:
+        return 0
+
+    conn = _get_db()
+    conn.execute("BEGIN")
+    try:
+        # OR IGNORE skips taken usernames without raising per row
+        cursor = conn.executemany(
+            "INSERT OR IGNORE INTO users (username, password) VALUES (?, ?)",
+            rows,
+        )
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+
+    with _user_cache_lock:
+        if cursor.rowcount == len(rows):
+            _user_cache.update(rows)
+        else:
+            # Some rows were ignored; let _load_user re-read the survivors
+            for username, _ in rows:
+                _user_cache.pop(username, None)
+    return cursor.rowcount
 
 
 def create_user(username: str, password: str) -> bool:
     """
     Insert a new user into the database.
     Returns True on success, False if username already exists.
-
-    NOTE: For a classroom project we keep the password as plain text.
-    In real applications you MUST hash passwords with a library such as
-    werkzeug.security or passlib.
+    Only a salted scrypt hash of the password is stored.
     """
-    username = (username or "").strip()
-    if not username or not password:
-        return False
+    return create_users_bulk([(username, password)]) == 1
 
-    try:
-        with _get_db() as conn:
-            conn.execute(
-                "INSERT INTO users (username, password) VALUES (?, ?)",
-                (username, password),
-            )
-            conn.commit()
-        return True
-    except sqlite3.IntegrityError:
-        # UNIQUE(username) constraint failed -> user already exists
-        return False
+
+def _upgrade_password(username: str, password: str):
+    """
+    Replace a legacy plain-text password with its scrypt hash. The row is
+    only rewritten if it still holds that plain-text value, so a password
+    changed while this write was queued is left alone.
+    """
+    hashed = hash_password(password)
+    cursor = _get_db().execute(
+        "UPDATE users SET password = ? WHERE username = ? AND password = ?",
+        (hashed, username, password),
+    )
+    if cursor.rowcount == 1:
+        with _user_cache_lock:
+            _user_cache[username] = hashed
 
 
 def validate_user(username: str, password: str) -> bool:
@@ -78,14 +272,29 @@ def validate_user(username: str, password: str) -> bool:
     if not username or not password:
         return False
 
-    with _get_db() as conn:
-        row = conn.execute(
-            "SELECT password FROM users WHERE username = ?", (username,)
-        ).fetchone()
+    password_sha = hashlib.sha256(password.encode()).digest()
+    with _verified_lock:
+        known_sha = _verified.get(username)
+        if known_sha is not None:
+            _verified.move_to_end(username)
+    if known_sha is not None and hmac.compare_digest(known_sha, password_sha):
+        return True
 
-    if row is None:
+    stored = _load_user(username)
+    if stored is None or not check_password(stored, password):
         return False
-    return row["password"] == password
+
+    if not stored.startswith(_HASH_PREFIX):
+        # Upgrade a legacy plain-text password now that we know it. The
+        # login does not wait for the hash or the write; if it fails the
+        # row is simply upgraded on a later login.
+        _db_writer.submit(_upgrade_password, username, password)
+
+    with _verified_lock:
+        _verified[username] = password_sha
+        if len(_verified) > _VERIFIED_MAXSIZE:
+            _verified.popitem(last=False)
+    return True
 
 
 # Create the database table on startup (safe to call multiple times)
@@ -94,14 +303,30 @@ init_auth_db()
 
 # ---------- Core Sentiment Helpers (same logic as Streamlit version) ----------
 
-def is_smartwatch_related(text: str) -> bool:
-    """
-    Checks if the text is related to smartwatch or product review.
-    Returns True if relevant, False otherwise.
-    """
-    text_lower = text.lower()
+# Results are memoized on the review text so re-submitted reviews and
+# duplicate CSV rows skip TextBlob. Set CACHE_ENABLED = False to always
+# recompute (e.g. when testing rule changes).
+CACHE_ENABLED = True
+CACHE_MAXSIZE = 65536
+
+
+def _memoize(func):
+    """LRU-cache a single-argument text helper, honouring CACHE_ENABLED."""
+    cached = functools.lru_cache(maxsize=CACHE_MAXSIZE)(func)
+
+    @functools.wraps(func)
+    def wrapper(text):
+        if CACHE_ENABLED:
+            return cached(text)
+        return func(text)
+
+    wrapper.cache_clear = cached.cache_clear
+    wrapper.cache_info = cached.cache_info
+    return wrapper
+
 
-    smartwatch_keywords = [
+SMARTWATCH_KEYWORDS: Final = frozenset(
+    {
         "smartwatch",
         "smart watch",
         "watch",
@@ -143,11 +368,11 @@ def is_smartwatch_related(text: str) -> bool:
         "recommend",
         "satisfied",
         "disappointed",
-    ]
-
-    keyword_count = sum(1 for keyword in smartwatch_keywords if keyword in text_lower)
+    }
+)
 
-    review_patterns = [
+REVIEW_PATTERNS: Final = frozenset(
+    {
         "star",
         "stars",
         "out of",
@@ -166,11 +391,72 @@ def is_smartwatch_related(text: str) -> bool:
         "worth",
         "money",
         "value",
-    ]
+    }
+)
 
-    pattern_count = sum(1 for pattern in review_patterns if pattern in text_lower)
 
-    return keyword_count >= 1 or pattern_count >= 2
+def _compile_phrases(phrases):
+    """
+    Build a matcher that scans an already lowercased text once and yields
+    a value for every phrase occurrence. `phrases` is either a collection
+    of phrases (the phrase itself is yielded) or a dict mapping each phrase
+    to the value to yield.
+    Uses an Aho–Corasick automaton when pyahocorasick is installed and a
+    compiled regex alternation otherwise.
+    """
+    if not isinstance(phrases, dict):
+        phrases = {phrase: phrase for phrase in phrases}
+
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for phrase, value in phrases.items():
+            automaton.add_word(phrase, value)
+        automaton.make_automaton()
+
+        def _iter_automaton(text_lower):
+            for _, value in automaton.iter(text_lower):
+                yield value
+
+        return _iter_automaton
+
+    # The lookahead reports the longest phrase starting at each position;
+    # shorter phrases sharing that start ("star" in "stars") are prefixes
+    # of it, so they are yielded alongside to match the automaton.
+    longest_first = sorted(phrases, key=lambda phrase: (-len(phrase), phrase))
+    pattern = re.compile("(?=(" + "|".join(map(re.escape, longest_first)) + "))")
+    prefixes = {p: [phrases[q] for q in phrases if p.startswith(q)] for p in phrases}
+
+    def _iter_regex(text_lower):
+        for match in pattern.finditer(text_lower):
+            yield from prefixes[match.group(1)]
+
+    return _iter_regex
+
+
+_match_smartwatch_keywords = _compile_phrases(SMARTWATCH_KEYWORDS)
+_match_review_patterns = _compile_phrases(REVIEW_PATTERNS)
+
+
+@_memoize
+def is_smartwatch_related(text: str) -> bool:
+    """
+    Checks if the text is related to smartwatch or product review.
+    Returns True if relevant, False otherwise.
+    """
+    text_lower = text.lower()
+
+    # A single smartwatch keyword is enough
+    for _ in _match_smartwatch_keywords(text_lower):
+        return True
+
+    # Otherwise require at least two distinct review patterns
+    patterns_found = set()
+    for pattern in _match_review_patterns(text_lower):
+        patterns_found.add(pattern)
+        if len(patterns_found) >= 2:
+            return True
+
+    return False
 
 
 def classify_polarity(polarity: float) -> str:
@@ -181,14 +467,8 @@ def classify_polarity(polarity: float) -> str:
     return "Neutral"
 
 
-def apply_domain_rules(text: str, sentiment: str, polarity: float):
-    """
-    Applies smartwatch-specific overrides so phrases like
-    'battery health is draining fast' are treated as negative.
-    """
-    text_lower = text.lower()
-
-    negative_triggers = [
+NEGATIVE_TRIGGERS: Final = frozenset(
+    {
         "draining fast",
         "battery drain",
         "battery draining",
@@ -202,9 +482,11 @@ def apply_domain_rules(text: str, sentiment: str, polarity: float):
         "watch stopped working",
         "screen cracked",
         "strap broke",
-    ]
+    }
+)
 
-    positive_triggers = [
+POSITIVE_TRIGGERS: Final = frozenset(
+    {
         "battery lasts all day",
         "excellent battery",
         "great battery life",
@@ -213,26 +495,59 @@ def apply_domain_rules(text: str, sentiment: str, polarity: float):
         "fast charging",
         "works flawlessly",
         "very responsive",
-    ]
+    }
+)
+
+# One alternation per list so each check is a single regex scan
+_NEGATIVE_TRIGGERS_RE = re.compile("|".join(map(re.escape, NEGATIVE_TRIGGERS)))
+_POSITIVE_TRIGGERS_RE = re.compile("|".join(map(re.escape, POSITIVE_TRIGGERS)))
+
 
-    if any(trigger in text_lower for trigger in negative_triggers):
+def apply_domain_rules(text: str, sentiment: str, polarity: float):
+    """
+    Applies smartwatch-specific overrides so phrases like
+    'battery health is draining fast' are treated as negative.
+    """
+    text_lower = text.lower()
+
+    if _NEGATIVE_TRIGGERS_RE.search(text_lower):
         return "Negative", -abs(polarity) if polarity != 0 else -0.4
 
-    if any(trigger in text_lower for trigger in positive_triggers):
+    if _POSITIVE_TRIGGERS_RE.search(text_lower):
         return "Positive", abs(polarity) if polarity != 0 else 0.4
 
     return sentiment, polarity
 
 
+# VADER scores a text in one lexicon pass without POS tagging; its compound
+# score is already in [-1, 1], so classify_polarity's thresholds still apply.
+# Without vaderSentiment we use the analyzer behind TextBlob(text).sentiment.
+if SentimentIntensityAnalyzer is not None:
+    _VADER = SentimentIntensityAnalyzer()
+
+    def _polarity_of(text: str) -> float:
+        """Return the VADER compound score of text."""
+        return _VADER.polarity_scores(text)["compound"]
+
+else:
+    _ANALYZER = PatternAnalyzer()
+
+    def _polarity_of(text: str) -> float:
+        """Return the TextBlob polarity of text without building a TextBlob."""
+        return _ANALYZER.analyze(text).polarity
+
+
+@_memoize
 def get_sentiment(text: str):
     """
-    Analyzes the sentiment of the input text using TextBlob.
+    Analyzes the sentiment of the input text using VADER (or TextBlob
+    when vaderSentiment is not installed).
     Returns (sentiment_label, polarity).
     """
-    blob = TextBlob(text)
-    polarity = blob.sentiment.polarity
+    polarity = _polarity_of(text)
 
-    sentiment = classify_polarity(polarity)
+    # Same thresholds as classify_polarity, inlined on this hot path
+    sentiment = "Positive" if polarity > 0.05 else "Negative" if polarity < -0.05 else "Neutral"
     sentiment, polarity = apply_domain_rules(text, sentiment, polarity)
 
     return sentiment, polarity
@@ -240,9 +555,37 @@ def get_sentiment(text: str):
 
 def get_confidence(polarity: float) -> float:
     """
-    Converts polarity (-1 to 1) into a 0–100 confidence value.
+    Converts polarity (-1 to 1) into a 0–100 confidence value,
+    rounded half-up to one decimal.
+    """
+    return (abs(polarity) * 1000 + 0.5) // 1 / 10.0
+
+
+def get_confidence_batch(polarities):
+    """
+    Vectorized get_confidence over a NumPy array of polarities; gives
+    exactly the same values since it runs the same float operations.
+    """
+    import numpy as np
+
+    return np.floor(np.abs(polarities) * 1000 + 0.5) / 10.0
+
+
+def round_polarity_batch(polarities):
+    """
+    Vectorized round(p, 3) over a NumPy array of polarities, with the same
+    results as round(). np.round scales in float64, so 0.9765 * 1000 comes
+    out just under 976.5 and rounds to 0.976 where round() gives 0.977.
+    Scaling in x87 extended precision (64-bit mantissa) is exact for any
+    float64, after which rint and the division by 1000 are correctly rounded.
+    Platforms whose long double is plain float64 fall back to round().
     """
-    return round(abs(polarity) * 100, 1)
+    import numpy as np
+
+    if np.finfo(np.longdouble).nmant < 63:
+        return np.array([round(p, 3) for p in polarities.tolist()], dtype=np.float64)
+    scaled = np.rint(polarities.astype(np.longdouble) * 1000)
+    return scaled.astype(np.float64) / 1000.0
 
 
 def analyze_aspects(review_text: str):
@@ -250,28 +593,55 @@ def analyze_aspects(review_text: str):
     Detects smartwatch aspects mentioned in the text and scores them individually.
     Returns a list of dictionaries with aspect details.
     """
-    aspect_keywords = {
-        "Battery": ["battery", "charge", "charging", "power", "life"],
-        "Display": ["display", "screen", "brightness", "touch", "resolution"],
-        "Comfort": ["strap", "band", "comfort", "fit", "wear"],
-        "Fitness Tracking": ["fitness", "heart rate", "steps", "tracking", "sleep"],
-        "Notifications": ["notification", "alerts", "calls", "messages"],
-        "Design & Build": ["design", "build", "quality", "durable", "style"],
-        "Price & Value": ["price", "cost", "value", "worth"],
-    }
+    # Hand out fresh dicts so callers never mutate the cached results
+    return [
+        dict(aspect, evidence=list(aspect["evidence"]))
+        for aspect in _score_aspects(review_text)
+    ]
 
-    blob = TextBlob(review_text)
-    sentences = blob.sentences if blob.sentences else [blob]
 
-    aspect_results = []
-    for aspect, keywords in aspect_keywords.items():
-        matched_sentences = []
-        for sentence in sentences:
-            sentence_text = str(sentence)
+ASPECT_KEYWORDS: Final = {
+    "Battery": ("battery", "charge", "charging", "power", "life"),
+    "Display": ("display", "screen", "brightness", "touch", "resolution"),
+    "Comfort": ("strap", "band", "comfort", "fit", "wear"),
+    "Fitness Tracking": ("fitness", "heart rate", "steps", "tracking", "sleep"),
+    "Notifications": ("notification", "alerts", "calls", "messages"),
+    "Design & Build": ("design", "build", "quality", "durable", "style"),
+    "Price & Value": ("price", "cost", "value", "worth"),
+}
+
+# Every aspect keyword in one matcher, tagged with the aspect it belongs to
+_match_aspect_keywords = _compile_phrases(
+    {keyword: aspect for aspect, keywords in ASPECT_KEYWORDS.items() for keyword in keywords}
+)
+
+
+@_memoize
+def _score_aspects(review_text: str):
+    blob = TextBlob(review_text)
+    sentences = blob.sentences
+    # Lowercase the review once and slice each sentence out of it; only
+    # possible when lowercasing kept every offset in place (it doesn't for
+    # e.g. "İ", which becomes two code points)
+    review_lower = review_text.lower()
+    sliceable = len(review_lower) == len(review_text)
+
+    # Single pass over the sentences, collecting matches for every aspect
+    aspect_sentences = {}
+    for sentence in sentences or [blob]:
+        sentence_text = str(sentence)
+        if sentences and sliceable:
+            sentence_lower = review_lower[sentence.start:sentence.end]
+        elif sliceable:
+            sentence_lower = review_lower
+        else:
             sentence_lower = sentence_text.lower()
-            if any(keyword in sentence_lower for keyword in keywords):
-                matched_sentences.append(sentence_text)
+        for aspect in set(_match_aspect_keywords(sentence_lower)):
+            aspect_sentences.setdefault(aspect, []).append(sentence_text)
 
+    aspect_results = []
+    for aspect in ASPECT_KEYWORDS:
+        matched_sentences = aspect_sentences.get(aspect)
         if matched_sentences:
             combined = " ".join(matched_sentences)
             aspect_sentiment, aspect_polarity = get_sentiment(combined)
@@ -280,1346 +650,412 @@ def analyze_aspects(review_text: str):
                     "aspect": aspect,
                     "sentiment": aspect_sentiment,
                     "polarity": round(aspect_polarity, 3),
-                    "confidence": get_confidence(aspect_polarity),
+                    "confidence": (abs(aspect_polarity) * 1000 + 0.5) // 1 / 10.0,
                     "evidence": matched_sentences[:2],
                 }
             )
 
-    return aspect_results
-
-
-SINGLE_TEMPLATE = """
-<!doctype html>
-<html>
-  <head>
-    <meta charset="utf-8">
-    <title>ABC X1 Smartwatch - Single Review</title>
-    <style>
-      :root {
-        --bg-gradient-start: #dcfce7;
-        --bg-gradient-end: #dbeafe;
-        --card-bg: #ffffff;
-        --card-border: rgba(148, 163, 184, 0.15);
-        --primary: #8b5cf6;
-        --primary-soft: rgba(139, 92, 246, 0.15);
-        --primary-hover: #a78bfa;
-        --text-main: #14532d;
-        --text-muted: #166534;
-        --text-dark: #052e16;
-        --danger: #dc2626;
-        --warning: #d97706;
-        --success-green: #16a34a;
-        --light-green: #86efac;
-        --radius-lg: 18px;
-        --radius-md: 12px;
-        --shadow-soft: 0 8px 24px rgba(0, 0, 0, 0.1);
-        --shadow-chip: 0 2px 8px rgba(0, 0, 0, 0.08);
-        --chip-bg: rgba(255, 255, 255, 0.98);
-      }
-
-      * {
-        box-sizing: border-box;
-      }
-
-      body {
-        margin: 0;
-        min-height: 100vh;
-        font-family: system-ui, -apple-system, BlinkMacSystemFont, "SF Pro Text",
-                     "Segoe UI", sans-serif;
-        color: var(--text-main);
-        background: linear-gradient(135deg, var(--bg-gradient-start) 0%, #cffafe 50%, var(--bg-gradient-end) 100%);
-        padding: 32px 16px 40px;
-      }
-
-      .page-shell {
-        max-width: 1080px;
-        margin: 0 auto;
-      }
-
-      .glow-orbit {
-        position: fixed;
-        inset: 0;
-        pointer-events: none;
-        opacity: 0.4;
-        background:
-          radial-gradient(circle at 0% 0%, rgba(34, 197, 94, 0.2) 0, transparent 60%),
-          radial-gradient(circle at 100% 20%, rgba(59, 130, 246, 0.15) 0, transparent 55%),
-          radial-gradient(circle at 50% 100%, rgba(34, 197, 94, 0.12) 0, transparent 50%);
-        z-index: -1;
-      }
-
-      .header {
-        display: flex;
-        align-items: center;
-        justify-content: space-between;
-        gap: 16px;
-        margin-bottom: 24px;
-      }
-
-      .header-main {
-        display: flex;
-        align-items: center;
-        gap: 14px;
-      }
-
-      .logo-pill {
-        width: 46px;
-        height: 46px;
-        border-radius: 999px;
-        background:
-          radial-gradient(circle at 30% 0%, rgba(255, 255, 255, 0.9) 0, transparent 45%),
-          conic-gradient(from 160deg, #22c55e, #8b5cf6, #3b82f6, #22c55e);
-        padding: 2px;
-        box-shadow: 0 4px 12px rgba(34, 197, 94, 0.25);
-        display: flex;
-        align-items: center;
-        justify-content: center;
-      }
-
-      .logo-inner {
-        width: 100%;
-        height: 100%;
-        border-radius: inherit;
-        background: linear-gradient(135deg, #dcfce7 0%, #dbeafe 100%);
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-size: 22px;
-      }
-
-      .app-title {
-        font-size: 22px;
-        font-weight: 600;
-        letter-spacing: 0.02em;
-        color: var(--text-dark);
-      }
-
-      .app-subtitle {
-        font-size: 13px;
-        color: var(--text-muted);
-        margin-top: 4px;
-      }
-
-      .header-meta {
-        display: flex;
-        flex-wrap: wrap;
-        gap: 8px;
-        justify-content: flex-end;
-      }
-
-      .chip {
-        display: inline-flex;
-        align-items: center;
-        gap: 6px;
-        padding: 6px 12px;
-        border-radius: 999px;
-        background: var(--chip-bg);
-        color: var(--text-dark);
-        font-size: 11px;
-        font-weight: 500;
-        border: 1px solid rgba(148, 163, 184, 0.2);
-        backdrop-filter: blur(18px);
-        box-shadow: var(--shadow-chip);
-      }
-
-      .chip-live {
-        background: linear-gradient(135deg, rgba(34, 197, 94, 0.15), rgba(22, 163, 74, 0.1));
-        border-color: rgba(34, 197, 94, 0.3);
-        color: #166534;
-      }
-
-      .chip-dot {
-        width: 8px;
-        height: 8px;
-        border-radius: 999px;
-        background: #22c55e;
-        box-shadow: 0 0 0 3px rgba(34, 197, 94, 0.25), 0 0 8px rgba(34, 197, 94, 0.4);
-        animation: pulse 2s infinite;
-      }
-
-      @keyframes pulse {
-        0%, 100% { opacity: 1; }
-        50% { opacity: 0.7; }
-      }
-
-      .layout {
-        display: grid;
-        grid-template-columns: minmax(0, 1.15fr) minmax(0, 1fr);
-        gap: 20px;
-      }
-
-      @media (max-width: 900px) {
-        .layout {
-          grid-template-columns: minmax(0, 1fr);
-        }
-        .header {
-          flex-direction: column;
-          align-items: flex-start;
-        }
-        .header-meta {
-          justify-content: flex-start;
+    return tuple(aspect_results)
+
+
+# Shared across requests; batch uploads fan their sentiment scoring out here
+_POOL = ThreadPoolExecutor(max_workers=os.cpu_count() or 4)
+
+# Reviews handed to each pool task; ThreadPoolExecutor.map ignores its own
+# chunksize argument, so batching is done by hand
+_POOL_CHUNKSIZE = 32
+
+# Large batches are scored in worker processes instead, since VADER and
+# TextBlob are pure Python and threads share one GIL. Only when this file is
+# imported as a module (serve.py): the workers re-import it by name.
+_PROCESS_WORKERS = (os.cpu_count() or 1) if __name__ != "__main__" else 1
+_PROCESS_MIN_TEXTS = 2000
+
+# /batch reads the review column this many rows at a time
+BATCH_CSV_CHUNKSIZE = 10_000
+BATCH_TABLE_ROWS = 200
+
+# Review column names picked automatically, in order of preference
+PREFERRED_TEXT_COLUMNS: Final = ("reviews.text", "text", "review", "reviews", "comment", "comments")
+
+# Whole-file dtype inference uses pandas' multi-threaded PyArrow parser when
+# pyarrow is installed (checked without importing it; pandas does that on first
+# use). Review text itself is always read with the "c" engine, which rejects
+# malformed quoting that PyArrow lets through.
+CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") is not None else "c"
+
+
+def _score_chunk(texts):
+    return [get_sentiment(text) for text in texts]
+
+
+def is_smartwatch_related_batch(texts):
+    """Vectorized is_smartwatch_related: a NumPy bool array, one entry per text."""
+    import numpy as np
+
+    return np.fromiter(
+        (is_smartwatch_related(text) for text in texts), dtype=bool, count=len(texts)
+    )
+
+
+def get_sentiment_batch(texts):
+    """
+    Vectorized get_sentiment over a list of texts, spread over _POOL (or
+    worker processes for large batches).
+    Returns (labels, polarities) as NumPy arrays aligned with texts.
+    """
+    import numpy as np
+
+    chunks = [texts[i:i + _POOL_CHUNKSIZE] for i in range(0, len(texts), _POOL_CHUNKSIZE)]
+    if _PROCESS_WORKERS > 1 and len(texts) >= _PROCESS_MIN_TEXTS:
+        from joblib import Parallel, delayed
+
+        # joblib groups the small chunks into larger batches per worker
+        scored = Parallel(n_jobs=_PROCESS_WORKERS, prefer="processes")(
+            delayed(_score_chunk)(chunk) for chunk in chunks
+        )
+    else:
+        scored = _POOL.map(_score_chunk, chunks)
+    scores = [score for chunk_scores in scored for score in chunk_scores]
+    labels = np.array([label for label, _ in scores], dtype=object)
+    polarities = np.array([polarity for _, polarity in scores], dtype=np.float64)
+    return labels, polarities
+
+
+def _count_sentiments(sentiments, counts=None):
+    """
+    Add the number of Positive/Neutral/Negative labels in sentiments to
+    counts (a fresh zeroed dict by default) and return it.
+    """
+    import numpy as np
+
+    if counts is None:
+        counts = {"Positive": 0, "Neutral": 0, "Negative": 0}
+    labels, label_counts = np.unique(np.asarray(sentiments, dtype=object), return_counts=True)
+    for label, n in zip(labels.tolist(), label_counts.tolist()):
+        if label in counts:
+            counts[label] += n
+    return counts
+
+
+def _read_csv_for_dtypes(file):
+    """
+    Whole-file read used only to find the text-like columns. Falls back to
+    the "c" engine when PyArrow fails to parse the file or it has no rows
+    (PyArrow types header-only columns as float64, "c" as object).
+    The file is rewound afterwards.
+    """
+    import pandas as pd
+
+    try:
+        if CSV_ENGINE != "c":
+            try:
+                df = pd.read_csv(file, engine=CSV_ENGINE)
+                if len(df):
+                    return df
+            except Exception:
+                pass
+            file.seek(0)
+        return pd.read_csv(file)
+    finally:
+        file.seek(0)
+
+
+def _resolve_text_column(file, text_column=None):
+    """
+    Pick the review column of an uploaded CSV for a streamed read, by the
+    same rules as a whole-file read: text_column if given, else the first
+    preferred name that is a text-like column, else the first text-like
+    column. Only the header and the candidate columns are parsed, chunk by
+    chunk, unless that leaves the choice open.
+    Returns (text_col, dtype, error); dtype is what the streamed read should
+    parse the column as. The file is rewound either way.
+    """
+    import pandas as pd
+
+    try:
+        columns = list(pd.read_csv(file, nrows=0).columns)
+    except Exception as exc:
+        return None, None, f"Could not read CSV: {exc}"
+    finally:
+        file.seek(0)
+
+    if text_column:
+        if text_column not in columns:
+            return None, None, f"text_column '{text_column}' not found."
+        candidates = [text_column]
+    else:
+        column_set = set(columns)
+        candidates = [col for col in PREFERRED_TEXT_COLUMNS if col in column_set]
+
+    if candidates:
+        # A column is text-like once any chunk of it parses as text, so the
+        # candidates are typed BATCH_CSV_CHUNKSIZE rows at a time. Reading
+        # stops as soon as the first candidate is known to be text.
+        text_like = set()
+        empty_slices = []
+        try:
+            # Closing the reader explicitly leaves file open; letting it be
+            # garbage-collected after the break would close file as well
+            with pd.read_csv(file, usecols=candidates, chunksize=BATCH_CSV_CHUNKSIZE) as reader:
+                for chunk in reader:
+                    text_like.update(chunk.select_dtypes(include=["object", "string"]).columns)
+                    if candidates[0] in text_like:
+                        break
+                    empty_slices.append(chunk.iloc[:0])
+        except Exception as exc:
+            return None, None, f"Could not read CSV: {exc}"
+        finally:
+            file.seek(0)
+        picked = next((col for col in candidates if col in text_like), None)
+        if picked is not None:
+            return picked, "string", None
+        # The dtype a whole-file read would infer from the per-chunk ones
+        requested_dtype = pd.concat(empty_slices)[text_column].dtype if text_column else None
+
+    # Otherwise the text-like columns need pandas' dtype inference over the whole file
+    try:
+        df = _read_csv_for_dtypes(file)
+    except Exception as exc:
+        return None, None, f"Could not read CSV: {exc}"
+    text_columns = list(df.select_dtypes(include=["object", "string"]).columns)
+    if not text_columns:
+        return None, None, "No text-like columns found in the CSV."
+    if text_column:
+        # A non-text column asked for by name is still analyzed, as str() of each value
+        return text_column, requested_dtype, None
+    return text_columns[0], "string", None
+
+
+def _has_surplus_fields(file) -> bool:
+    """
+    True when a data row of the uploaded CSV has more fields than the
+    header, or the file cannot be scanned. One pass with the csv module in
+    constant memory; the file is rewound afterwards.
+    """
+    text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+    try:
+        rows = csv.reader(text)
+        width = len(next(rows, ()))
+        return any(len(row) > width for row in rows)
+    except (csv.Error, UnicodeDecodeError):
+        return True
+    finally:
+        text.detach()
+        file.seek(0)
+
+
+def _read_text_column(file, text_col, text_dtype):
+    """
+    Yield text_col of an uploaded CSV BATCH_CSV_CHUNKSIZE rows at a time,
+    parsing only that column. The C parser ignores surplus fields under
+    usecols, so files with such rows are read in full instead and fail with
+    the same ParserError as the whole-file read.
+    """
+    import pandas as pd
+
+    usecols = None if _has_surplus_fields(file) else [text_col]
+    with pd.read_csv(
+        file, usecols=usecols, dtype={text_col: text_dtype}, chunksize=BATCH_CSV_CHUNKSIZE
+    ) as reader:
+        for chunk in reader:
+            yield chunk[text_col]
+
+
+def _score_column(column, valid, relevant_flag, irrelevant_row, empty_row, limit=None):
+    """
+    Relevance and sentiment for one chunk of review text, with whole-column
+    masks instead of a per-row loop. column holds each cell's text and
+    valid marks the cells that have any. Returns (rows, sentiments,
+    polarities): the row dicts for the first limit cells (all of them by
+    default) plus the labels and rounded polarities of the relevant rows.
+    Relevant rows are marked with relevant_flag; irrelevant_row and
+    empty_row give the sentiment, polarity, confidence and relevant values
+    of the other valid rows and of the empty cells.
+    """
+    import numpy as np
+
+    texts = column[valid].tolist()
+    relevant_in_texts = is_smartwatch_related_batch(texts)
+    sentiments, polarities = get_sentiment_batch(
+        [text for text, is_relevant in zip(texts, relevant_in_texts) if is_relevant]
+    )
+    polys = round_polarity_batch(polarities).tolist()
+
+    wanted = len(column) if limit is None else min(limit, len(column))
+    if wanted <= 0:
+        return [], sentiments.tolist(), polys
+
+    # Scatter back to full-length per-row columns
+    relevant = np.zeros(len(column), dtype=bool)
+    relevant[np.flatnonzero(valid)[relevant_in_texts]] = True
+    review_col = np.full(len(column), None, dtype=object)
+    review_col[valid] = texts
+    scored = {
+        "sentiment": sentiments.tolist(),
+        "polarity": polys,
+        "confidence": get_confidence_batch(polarities).tolist(),
+        "relevant": relevant_flag,
+    }
+    cols = {}
+    for key, relevant_values in scored.items():
+        col = np.empty(len(column), dtype=object)
+        col[valid] = irrelevant_row[key]
+        col[~valid] = empty_row[key]
+        col[relevant] = relevant_values
+        cols[key] = col[:wanted].tolist()
+
+    rows = [
+        {
+            "review": review,
+            "sentiment": sentiment,
+            "polarity": polarity,
+            "confidence": confidence,
+            "relevant": is_relevant,
         }
-      }
-
-      .card {
-        background: var(--card-bg);
-        border-radius: var(--radius-lg);
-        border: 1px solid var(--card-border);
-        box-shadow: var(--shadow-soft);
-        padding: 20px 20px 18px;
-        position: relative;
-        overflow: hidden;
-        backdrop-filter: blur(10px);
-      }
-
-      .card::before {
-        content: "";
-        position: absolute;
-        inset: 0;
-        pointer-events: none;
-        background:
-          radial-gradient(circle at top right, rgba(139, 92, 246, 0.1) 0, transparent 60%),
-          radial-gradient(circle at bottom left, rgba(34, 197, 94, 0.08) 0, transparent 50%);
-        opacity: 0.6;
-      }
-
-      .card-title {
-        font-size: 16px;
-        font-weight: 700;
-        margin-bottom: 12px;
-        color: var(--text-dark);
-        letter-spacing: -0.01em;
-      }
-
-      .label {
-        font-weight: 500;
-        font-size: 13px;
-        color: var(--text-dark);
-      }
-
-      textarea {
-        width: 100%;
-        margin-top: 6px;
-        padding: 12px 14px;
-        border-radius: 12px;
-        border: 1.5px solid rgba(148, 163, 184, 0.3);
-        background: #fafafa;
-        color: var(--text-dark);
-        resize: vertical;
-        min-height: 140px;
-        font-size: 13px;
-        line-height: 1.5;
-        transition: all 0.2s ease;
-      }
-
-      textarea:focus-visible {
-        outline: none;
-        border-color: var(--primary);
-        box-shadow: 0 0 0 3px rgba(139, 92, 246, 0.15), 0 2px 8px rgba(139, 92, 246, 0.1);
-        background: #ffffff;
-      }
-
-      .form-footer {
-        display: flex;
-        align-items: center;
-        justify-content: space-between;
-        gap: 10px;
-        margin-top: 10px;
-        flex-wrap: wrap;
-      }
-
-      .checkbox-row {
-        display: flex;
-        align-items: center;
-        gap: 6px;
-        font-size: 12px;
-        color: var(--text-dark);
-      }
-
-      .checkbox-row input[type="checkbox"] {
-        accent-color: var(--primary);
-      }
-
-      .button-row {
-        display: flex;
-        align-items: center;
-        gap: 8px;
-        flex-wrap: wrap;
-      }
-
-      .btn-primary {
-        border: none;
-        cursor: pointer;
-        padding: 10px 18px;
-        border-radius: 999px;
-        font-size: 13px;
-        font-weight: 600;
-        color: #ffffff;
-        background: radial-gradient(circle at 0% 0%, rgba(167, 139, 250, 0.8) 0, transparent 60%),
-                    linear-gradient(135deg, var(--primary) 0%, #a78bfa 50%, var(--primary-hover) 100%);
-        box-shadow: 0 4px 14px rgba(139, 92, 246, 0.4), 0 2px 4px rgba(139, 92, 246, 0.2);
-        display: inline-flex;
-        align-items: center;
-        gap: 6px;
-        transition: all 0.2s ease;
-      }
-
-      .btn-primary:hover {
-        transform: translateY(-2px);
-        filter: brightness(1.08);
-        box-shadow: 0 6px 20px rgba(139, 92, 246, 0.5), 0 4px 8px rgba(139, 92, 246, 0.3);
-      }
-
-      .btn-primary:active {
-        transform: translateY(0);
-        box-shadow: 0 2px 10px rgba(139, 92, 246, 0.4);
-      }
-
-      .btn-ghost {
-        font-size: 12px;
-        border-radius: 999px;
-        padding: 7px 12px;
-        border: 1.5px solid rgba(148, 163, 184, 0.3);
-        color: var(--text-dark);
-        text-decoration: none;
-        display: inline-flex;
-        align-items: center;
-        gap: 5px;
-        background: rgba(255, 255, 255, 0.95);
-        backdrop-filter: blur(16px);
-        font-weight: 500;
-        transition: all 0.2s ease;
-      }
-
-      .btn-ghost span {
-        opacity: 0.95;
-      }
-
-      .btn-ghost:hover {
-        color: var(--text-dark);
-        border-color: rgba(139, 92, 246, 0.5);
-        background: rgba(255, 255, 255, 1);
-        box-shadow: 0 2px 8px rgba(139, 92, 246, 0.15);
-        transform: translateY(-1px);
-      }
-
-      .alert {
-        margin-top: 10px;
-        padding: 8px 10px;
-        border-radius: var(--radius-md);
-        font-size: 12px;
-        display: flex;
-        align-items: flex-start;
-        gap: 8px;
-      }
-
-      .alert-icon {
-        margin-top: 1px;
-      }
-
-      .alert-warning {
-        background: linear-gradient(135deg, rgba(250, 204, 21, 0.15), rgba(251, 191, 36, 0.08));
-        border: 1px solid rgba(217, 119, 6, 0.4);
-        color: #b45309;
-      }
-
-      .alert-error {
-        background: linear-gradient(135deg, rgba(248, 113, 113, 0.15), rgba(220, 38, 38, 0.1));
-        border: 1px solid rgba(220, 38, 38, 0.4);
-        color: #991b1b;
-      }
-
-      .alert p {
-        margin: 0;
-      }
-
-      .badge {
-        display: inline-flex;
-        align-items: center;
-        gap: 6px;
-        padding: 4px 9px;
-        border-radius: 999px;
-        font-size: 11px;
-        line-height: 1;
-        border: 1px solid transparent;
-      }
-
-      .badge-dot {
-        width: 7px;
-        height: 7px;
-        border-radius: 999px;
-        background: currentColor;
-      }
-
-      .badge-pos {
-        background: linear-gradient(135deg, rgba(34, 197, 94, 0.2), rgba(22, 163, 74, 0.15));
-        color: #166534;
-        border-color: rgba(34, 197, 94, 0.5);
-        font-weight: 700;
-        box-shadow: 0 2px 6px rgba(34, 197, 94, 0.2);
-      }
-
-      .badge-neg {
-        background: linear-gradient(135deg, rgba(220, 38, 38, 0.2), rgba(185, 28, 28, 0.15));
-        color: #991b1b;
-        border-color: rgba(220, 38, 38, 0.5);
-        font-weight: 700;
-        box-shadow: 0 2px 6px rgba(220, 38, 38, 0.2);
-      }
-
-      .badge-neu {
-        background: linear-gradient(135deg, rgba(148, 163, 184, 0.2), rgba(100, 116, 139, 0.15));
-        color: #475569;
-        border-color: rgba(148, 163, 184, 0.5);
-        font-weight: 700;
-        box-shadow: 0 2px 6px rgba(148, 163, 184, 0.15);
-      }
-
-      .metric-grid {
-        display: grid;
-        grid-template-columns: repeat(3, minmax(0, 1fr));
-        gap: 12px;
-        margin: 14px 0 16px;
-      }
-
-      .metric {
-        padding: 10px 12px;
-        border-radius: var(--radius-md);
-        background: linear-gradient(135deg, #fafafa 0%, #f5f5f5 100%);
-        border: 1.5px solid rgba(148, 163, 184, 0.2);
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.04);
-        transition: all 0.2s ease;
-      }
-
-      .metric:hover {
-        transform: translateY(-1px);
-        box-shadow: 0 4px 8px rgba(0, 0, 0, 0.06);
-      }
-
-      .metric-label {
-        font-size: 11px;
-        color: var(--text-muted);
-        font-weight: 600;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-      }
-
-      .metric-value {
-        font-size: 16px;
-        margin-top: 4px;
-        color: var(--text-dark);
-        font-weight: 700;
-      }
-
-      .sentiment-positive {
-        color: #166534 !important;
-        background: linear-gradient(135deg, rgba(34, 197, 94, 0.15), rgba(22, 163, 74, 0.1));
-        padding: 5px 10px;
-        border-radius: 8px;
-        display: inline-block;
-        border: 1.5px solid rgba(34, 197, 94, 0.4);
-        box-shadow: 0 2px 6px rgba(34, 197, 94, 0.2);
-        font-weight: 700;
-      }
-
-      .sentiment-negative {
-        color: #991b1b !important;
-        background: linear-gradient(135deg, rgba(220, 38, 38, 0.15), rgba(185, 28, 28, 0.1));
-        padding: 5px 10px;
-        border-radius: 8px;
-        display: inline-block;
-        border: 1.5px solid rgba(220, 38, 38, 0.4);
-        box-shadow: 0 2px 6px rgba(220, 38, 38, 0.2);
-        font-weight: 700;
-      }
-
-      .sentiment-neutral {
-        color: #475569 !important;
-        background: linear-gradient(135deg, rgba(148, 163, 184, 0.15), rgba(100, 116, 139, 0.1));
-        padding: 5px 10px;
-        border-radius: 8px;
-        display: inline-block;
-        border: 1.5px solid rgba(148, 163, 184, 0.4);
-        box-shadow: 0 2px 6px rgba(148, 163, 184, 0.15);
-        font-weight: 700;
-      }
-
-      .polarity-value {
-        font-family: 'Courier New', monospace;
-        font-weight: 700;
-      }
-
-      .bar-section-title {
-        font-size: 13px;
-        margin-bottom: 6px;
-        color: var(--text-dark);
-        font-weight: 600;
-      }
-
-      .bar-caption {
-        font-size: 11px;
-        color: var(--text-muted);
-        margin-bottom: 8px;
-        font-weight: 500;
-      }
-
-      .bar-container {
-        height: 16px;
-        background: linear-gradient(90deg, #f1f5f9 0%, #e2e8f0 100%);
-        border-radius: 999px;
-        overflow: hidden;
-        border: 1.5px solid rgba(148, 163, 184, 0.25);
-        position: relative;
-        box-shadow: inset 0 2px 4px rgba(0, 0, 0, 0.05);
-      }
-
-      .bar-fill {
-        height: 100%;
-        transition: width 0.4s cubic-bezier(0.4, 0, 0.2, 1);
-        position: relative;
-      }
-
-      .bar-fill::after {
-        content: '';
-        position: absolute;
-        top: 0;
-        left: 0;
-        right: 0;
-        bottom: 0;
-        background: linear-gradient(90deg, transparent, rgba(255, 255, 255, 0.3), transparent);
-      }
-
-      .bar-pos {
-        background: linear-gradient(90deg, #22c55e 0%, #4ade80 50%, #86efac 100%);
-        box-shadow: 0 0 12px rgba(34, 197, 94, 0.4), inset 0 1px 2px rgba(255, 255, 255, 0.3);
-      }
-
-      .bar-neg {
-        background: linear-gradient(90deg, #ef4444 0%, #f87171 50%, #fca5a5 100%);
-        box-shadow: 0 0 12px rgba(220, 38, 38, 0.4), inset 0 1px 2px rgba(255, 255, 255, 0.3);
-      }
-
-      .bar-neu {
-        background: linear-gradient(90deg, #64748b 0%, #94a3b8 50%, #cbd5e1 100%);
-        box-shadow: 0 0 12px rgba(100, 116, 139, 0.3), inset 0 1px 2px rgba(255, 255, 255, 0.3);
-      }
-
-      .aspects-list {
-        list-style: none;
-        padding: 0;
-        margin: 8px 0 0;
-        display: flex;
-        flex-direction: column;
-        gap: 8px;
-        font-size: 13px;
-      }
-
-      .aspect-row {
-        display: flex;
-        justify-content: space-between;
-        gap: 10px;
-        align-items: flex-start;
-      }
-
-      .aspect-main {
-        display: flex;
-        flex-direction: column;
-        gap: 2px;
-      }
-
-      .aspect-label {
-        font-weight: 600;
-        color: var(--text-dark);
-      }
-
-      .aspect-meta {
-        font-size: 11px;
-        color: var(--text-muted);
-        font-weight: 500;
-      }
-
-      .aspect-evidence {
-        font-size: 11px;
-        color: var(--text-muted);
-        margin-top: 2px;
-      }
-
-      .aspect-pill {
-        white-space: nowrap;
-        padding: 4px 8px;
-        border-radius: 999px;
-        background: #f9fafb;
-        border: 1px solid rgba(148, 163, 184, 0.3);
-        font-size: 11px;
-        color: var(--text-dark);
-        font-weight: 500;
-      }
-
-      .empty-hint {
-        font-size: 12px;
-        color: var(--text-muted);
-        margin-top: 4px;
-      }
-    </style>
-  </head>
-  <body>
-    <div class="glow-orbit"></div>
-    <div class="page-shell">
-      <header class="header">
-        <div class="header-main">
-          <div class="logo-pill">
-            <div class="logo-inner">⌚</div>
-          </div>
-          <div>
-            <div class="app-title">ABC X1 Smartwatch – Sentiment Studio</div>
-            <div class="app-subtitle">Analyze customer reviews with domain‑tuned sentiment and aspect insights.</div>
-          </div>
-        </div>
-        <div class="header-meta">
-          <div class="chip chip-live">
-            <span class="chip-dot"></span>
-            <span>Live analyzer</span>
-          </div>
-          <div class="chip">
-            <span>Smartwatch domain model</span>
-          </div>
-          {% if current_user %}
-            <div class="chip">
-              <span>Logged in as <b>{{ current_user }}</b></span>
-            </div>
-            <form method="post" action="{{ url_for('logout') }}" style="margin:0;">
-              <button type="submit" class="btn-ghost" style="background:#166534; color:#ffffff; border-color:#166534;">
-                <span>Logout</span>
-              </button>
-            </form>
-          {% endif %}
-        </div>
-      </header>
-
-      <div class="layout">
-        <div class="card">
-          <div class="card-title">Single review</div>
-          <form method="post">
-            <div>
-              <label class="label" for="review_text">Review text</label><br>
-              <textarea id="review_text" name="review_text" rows="6"
-                placeholder="Type your smartwatch review here...">{{ review_text }}</textarea>
-            </div>
-
-            {% if enforce_warning %}
-              <div class="alert alert-warning">
-                <div class="alert-icon">⚠</div>
-                <p>
-                  The text doesn't look like a smartwatch / product review.
-                  This workspace is tuned specifically for <b>ABC X1 smartwatch feedback</b>.
-                  Check that your text describes the device, its features or your experience using it.
-                </p>
-              </div>
-            {% endif %}
-
-            {% if error %}
-              <div class="alert alert-error">
-                <div class="alert-icon">⛔</div>
-                <p>{{ error }}</p>
-              </div>
-            {% endif %}
-
-            <div class="form-footer">
-              <label class="checkbox-row">
-                <input type="checkbox" name="proceed_anyway" value="1"
-                  {% if proceed_anyway %}checked{% endif %}>
-                <span>Proceed even if not clearly smartwatch‑related</span>
-              </label>
-              <div class="button-row">
-                <button class="btn-primary" type="submit">
-                  <span>🔍</span>
-                  <span>Analyze review</span>
-                </button>
-                <a href="/batch" class="btn-ghost">
-                  <span>Batch analysis</span>
-                  <span>▶</span>
-                </a>
-              </div>
-            </div>
-          </form>
-        </div>
-
-        <div class="card">
-          <div class="card-title">Analysis results</div>
-          {% if sentiment %}
-            <div style="display:flex; align-items:center; justify-content:space-between; gap:8px; flex-wrap:wrap;">
-              <div>
-                {% if relevant %}
-                  <span class="badge badge-pos">
-                    <span class="badge-dot"></span>
-                    <span>Smartwatch‑related</span>
-                  </span>
-                {% elif relevant is not none %}
-                  <span class="badge badge-neu">
-                    <span class="badge-dot"></span>
-                    <span>Non‑smartwatch text (testing mode)</span>
-                  </span>
-                {% endif %}
-              </div>
-            </div>
-
-            <div class="metric-grid">
-              <div class="metric">
-                <div class="metric-label">Overall sentiment</div>
-                <div class="metric-value sentiment-{{ sentiment.lower() }}">{{ sentiment }}</div>
-              </div>
-              <div class="metric">
-                <div class="metric-label">Polarity</div>
-                <div class="metric-value polarity-value">{{ polarity }}</div>
-              </div>
-              <div class="metric">
-                <div class="metric-label">Confidence</div>
-                <div class="metric-value">{{ confidence }}%</div>
-              </div>
-            </div>
-
-            <div style="margin-top:8px; margin-bottom:14px;">
-              <div class="bar-section-title">Polarity visualization</div>
-              <p class="bar-caption">
-                <span style="color:#991b1b; font-weight:600;">-1.0 (Negative)</span> &larr; 
-                <span style="color:#475569; font-weight:600;">0.0 (Neutral)</span> &rarr; 
-                <span style="color:#166534; font-weight:600;">1.0 (Positive)</span>
-              </p>
-              <div class="bar-container">
-                {% set pct = (polarity + 1) / 2 * 100 %}
-                {% if sentiment == "Positive" %}
-                  {% set bar_class = "bar-pos" %}
-                {% elif sentiment == "Negative" %}
-                  {% set bar_class = "bar-neg" %}
-                {% else %}
-                  {% set bar_class = "bar-neu" %}
-                {% endif %}
-                <div class="bar-fill {{ bar_class }}" style="width: {{ pct }}%;"></div>
-              </div>
-              <div style="display:flex; justify-content:space-between; margin-top:4px; font-size:10px; color:var(--text-muted);">
-                <span>-1.0</span>
-                <span style="font-weight:600; color:var(--text-dark);">Current: {{ polarity }}</span>
-                <span>1.0</span>
-              </div>
-            </div>
-
-            <div>
-              <div class="bar-section-title">Aspect insights</div>
-              {% if aspects and aspects|length > 0 %}
-                <ul class="aspects-list">
-                  {% for a in aspects %}
-                    <li class="aspect-row">
-                      <div class="aspect-main">
-                        <span class="aspect-label">{{ a.aspect }}</span>
-                        <span class="aspect-meta">
-                          {{ a.sentiment }} &nbsp;•&nbsp;
-                          polarity {{ a.polarity }}, {{ a.confidence }}%
-                        </span>
-                        {% if a.evidence %}
-                          <div class="aspect-evidence">
-                            {{ a.evidence | join("; ") }}
-                          </div>
-                        {% endif %}
-                      </div>
-                      <div class="aspect-pill">
-                        Aspect
-                      </div>
-                    </li>
-                  {% endfor %}
-                </ul>
-              {% else %}
-                <p class="empty-hint">
-                  No explicit aspects detected. Mention battery, display, comfort, notifications or price
-                  to surface more granular insights.
-                </p>
-              {% endif %}
-            </div>
-          {% else %}
-            <p class="empty-hint">
-              Results will appear here once you analyze a review.
-            </p>
-          {% endif %}
-        </div>
-      </div>
-    </div>
-  </body>
-</html>
-"""
-
-
-BATCH_TEMPLATE = """
-<!doctype html>
-<html>
-  <head>
-    <meta charset="utf-8">
-    <title>ABC X1 Smartwatch - Batch Analysis</title>
-    <style>
-      body {
-        margin: 0;
-        min-height: 100vh;
-        font-family: system-ui, -apple-system, BlinkMacSystemFont, "SF Pro Text",
-                     "Segoe UI", sans-serif;
-        background: linear-gradient(135deg, #dcfce7 0%, #cffafe 50%, #dbeafe 100%);
-        padding: 32px 16px 40px;
-        color: #14532d;
-      }
-
-      .page-shell {
-        max-width: 1100px;
-        margin: 0 auto;
-      }
-
-      .header {
-        display: flex;
-        align-items: center;
-        justify-content: space-between;
-        gap: 16px;
-        margin-bottom: 20px;
-      }
-
-      .title-block {
-        display: flex;
-        flex-direction: column;
-        gap: 4px;
-      }
-
-      .title-main {
-        font-size: 21px;
-        font-weight: 600;
-        letter-spacing: 0.02em;
-        color: #14532d;
-      }
-
-      .title-sub {
-        font-size: 13px;
-        color: #15803d;
-      }
-
-      .btn-ghost {
-        font-size: 12px;
-        border-radius: 999px;
-        padding: 7px 11px;
-        border: 1px solid rgba(148, 163, 184, 0.4);
-        color: #14532d;
-        text-decoration: none;
-        display: inline-flex;
-        align-items: center;
-        gap: 5px;
-        background: rgba(255, 255, 255, 0.9);
-        backdrop-filter: blur(16px);
-        transition: border-color 120ms ease, color 120ms ease, background 120ms ease;
-      }
-
-      .btn-ghost:hover {
-        color: #14532d;
-        border-color: rgba(124, 58, 237, 0.6);
-        background: rgba(255, 255, 255, 1);
-      }
-
-      .card {
-        background: #ffffff;
-        border-radius: 18px;
-        border: 1px solid rgba(148, 163, 184, 0.15);
-        box-shadow: 0 8px 24px rgba(0, 0, 0, 0.1);
-        padding: 20px 20px 16px;
-        margin-bottom: 16px;
-        backdrop-filter: blur(10px);
-      }
-
-      .card-title {
-        font-size: 16px;
-        font-weight: 700;
-        margin-bottom: 10px;
-        color: #052e16;
-        letter-spacing: -0.01em;
-      }
-
-      label {
-        font-size: 13px;
-        color: #14532d;
-        font-weight: 600;
-      }
-
-      input[type="text"] {
-        margin-top: 4px;
-        padding: 7px 9px;
-        border-radius: 10px;
-        border: 1px solid rgba(148, 163, 184, 0.4);
-        background: #f9fafb;
-        color: #14532d;
-        width: 260px;
-        font-size: 13px;
-      }
-
-      input[type="text"]:focus-visible {
-        outline: none;
-        border-color: #7c3aed;
-        box-shadow: 0 0 0 2px rgba(124, 58, 237, 0.2);
-        background: #ffffff;
-      }
-
-      input[type="file"] {
-        margin-top: 4px;
-        font-size: 13px;
-        color: #14532d;
-      }
-
-      .btn-primary {
-        border: none;
-        cursor: pointer;
-        padding: 10px 18px;
-        border-radius: 999px;
-        font-size: 13px;
-        font-weight: 600;
-        color: #ffffff;
-        background: radial-gradient(circle at 0% 0%, rgba(167, 139, 250, 0.8) 0, transparent 60%),
-                    linear-gradient(135deg, #8b5cf6 0%, #a78bfa 50%, #c4b5fd 100%);
-        box-shadow: 0 4px 14px rgba(139, 92, 246, 0.4), 0 2px 4px rgba(139, 92, 246, 0.2);
-        display: inline-flex;
-        align-items: center;
-        gap: 6px;
-        transition: all 0.2s ease;
-        margin-top: 8px;
-      }
-
-      .btn-primary:hover {
-        transform: translateY(-2px);
-        filter: brightness(1.08);
-        box-shadow: 0 6px 20px rgba(139, 92, 246, 0.5), 0 4px 8px rgba(139, 92, 246, 0.3);
-      }
-
-      .btn-primary:active {
-        transform: translateY(0);
-        box-shadow: 0 2px 10px rgba(139, 92, 246, 0.4);
-      }
-
-      .alert-error {
-        margin-top: 10px;
-        padding: 8px 10px;
-        border-radius: 12px;
-        font-size: 12px;
-        background: linear-gradient(135deg, rgba(248, 113, 113, 0.15), rgba(220, 38, 38, 0.1));
-        border: 1px solid rgba(220, 38, 38, 0.4);
-        color: #991b1b;
-      }
-
-      .summary-grid {
-        display: grid;
-        grid-template-columns: repeat(3, minmax(0, 1fr));
-        gap: 10px;
-        margin-top: 6px;
-      }
-
-      .summary-item {
-        padding: 10px 12px;
-        border-radius: 12px;
-        background: linear-gradient(135deg, #fafafa 0%, #f5f5f5 100%);
-        border: 1.5px solid rgba(148, 163, 184, 0.2);
-        font-size: 12px;
-        box-shadow: 0 2px 4px rgba(0, 0, 0, 0.04);
-        transition: all 0.2s ease;
-      }
-
-      .summary-item:hover {
-        transform: translateY(-1px);
-        box-shadow: 0 4px 8px rgba(0, 0, 0, 0.06);
-      }
-
-      .summary-label {
-        color: #15803d;
-        font-weight: 600;
-        text-transform: uppercase;
-        letter-spacing: 0.5px;
-        font-size: 11px;
-      }
-
-      .summary-value {
-        margin-top: 4px;
-        font-size: 14px;
-        color: #052e16;
-        font-weight: 700;
-      }
-
-      table {
-        border-collapse: collapse;
-        width: 100%;
-        font-size: 12px;
-      }
-
-      th, td {
-        border: 1px solid rgba(31, 41, 55, 0.95);
-        padding: 6px 8px;
-        vertical-align: top;
-      }
-
-      th {
-        background: linear-gradient(135deg, #f9fafb, #f1f5f9);
-        font-weight: 600;
-        color: #14532d;
-        position: sticky;
-        top: 0;
-        z-index: 1;
-      }
-
-      td {
-        color: #14532d;
-      }
-
-      tbody tr:nth-child(even) {
-        background: #f9fafb;
-      }
-
-      tbody tr:nth-child(odd) {
-        background: #ffffff;
-      }
-
-      .table-scroll {
-        max-height: 380px;
-        overflow-y: auto;
-        border-radius: 12px;
-        border: 1px solid rgba(148, 163, 184, 0.3);
-      }
-    </style>
-  </head>
-  <body>
-    <div class="page-shell">
-      <header class="header">
-        <div class="title-block">
-          <div class="title-main">⌚ ABC X1 Smartwatch – Batch Sentiment</div>
-          <div class="title-sub">Upload a CSV of reviews to analyze sentiment and relevance at scale.</div>
-        </div>
-        <div style="display:flex; align-items:center; gap:8px; flex-wrap:wrap;">
-          <a href="/" class="btn-ghost">
-            <span>◀</span>
-            <span>Back to single review</span>
-          </a>
-          {% if current_user %}
-            <span style="font-size:12px; color:#14532d; font-weight:500;">Logged in as <b>{{ current_user }}</b></span>
-            <form method="post" action="{{ url_for('logout') }}" style="margin:0;">
-              <button type="submit" class="btn-ghost" style="background:#166534; color:#ffffff; border-color:#166534;">
-                <span>Logout</span>
-              </button>
-            </form>
-          {% endif %}
-        </div>
-      </header>
-
-      <div class="card">
-        <div class="card-title">Upload reviews</div>
-        <form method="post" enctype="multipart/form-data">
-          <div>
-            <label for="file"><b>CSV file</b></label><br>
-            <input type="file" id="file" name="file" accept=".csv">
-          </div>
-          <div style="margin-top: 8px;">
-            <label for="text_column"><b>Text column (optional)</b></label><br>
-            <input type="text" id="text_column" name="text_column"
-              placeholder="e.g. reviews.text, text, review">
-          </div>
-
-          {% if error %}
-            <div class="alert-error">{{ error }}</div>
-          {% endif %}
-
-          <button type="submit" class="btn-primary">
-            <span>🔍</span>
-            <span>Analyze all reviews</span>
-          </button>
-        </form>
-      </div>
-
-      {% if summary %}
-        <div class="card">
-          <div class="card-title">Batch analysis results</div>
-          <div class="summary-grid">
-            <div class="summary-item">
-              <div class="summary-label">Total rows</div>
-              <div class="summary-value">{{ summary.total_rows }}</div>
-            </div>
-            <div class="summary-item">
-              <div class="summary-label">Text column</div>
-              <div class="summary-value">{{ summary.text_column }}</div>
-            </div>
-            <div class="summary-item">
-              <div class="summary-label">Relevant / Irrelevant</div>
-              <div class="summary-value">
-                {{ summary.relevant_count }} relevant • {{ summary.irrelevant_count }} filtered out
-              </div>
-            </div>
-            <div class="summary-item">
-              <div class="summary-label">Sentiment (relevant only)</div>
-              <div class="summary-value">
-                <span style="color:#166534; font-weight:700;">Pos: {{ summary.sentiment_distribution.Positive }}</span>,
-                <span style="color:#475569; font-weight:700;">Neu: {{ summary.sentiment_distribution.Neutral }}</span>,
-                <span style="color:#991b1b; font-weight:700;">Neg: {{ summary.sentiment_distribution.Negative }}</span>
-              </div>
-            </div>
-            <div class="summary-item">
-              <div class="summary-label">Avg polarity (relevant only)</div>
-              <div class="summary-value">
-                {% if summary.average_polarity is not none %}
-                  {{ summary.average_polarity }}
-                {% else %}
-                  N/A
-                {% endif %}
-              </div>
-            </div>
-          </div>
-        </div>
-
-        {% if rows %}
-          <div class="card">
-            <div class="card-title">Sample of analyzed rows (first 200)</div>
-            <div class="table-scroll">
-              <table>
-                <thead>
-                  <tr>
-                    <th>Review</th>
-                    <th>Sentiment</th>
-                    <th>Polarity</th>
-                    <th>Confidence</th>
-                    <th>Relevant</th>
-                  </tr>
-                </thead>
-                <tbody>
-                  {% for r in rows %}
-                    <tr>
-                      <td>{{ r.review }}</td>
-                      <td>
-                        {% if r.sentiment == "Positive" %}
-                          <span style="color:#166534; font-weight:600; background:rgba(34, 197, 94, 0.1); padding:2px 6px; border-radius:4px; border:1px solid rgba(34, 197, 94, 0.3);">{{ r.sentiment }}</span>
-                        {% elif r.sentiment == "Negative" %}
-                          <span style="color:#991b1b; font-weight:600; background:rgba(220, 38, 38, 0.1); padding:2px 6px; border-radius:4px; border:1px solid rgba(220, 38, 38, 0.3);">{{ r.sentiment }}</span>
-                        {% elif r.sentiment == "Neutral" %}
-                          <span style="color:#475569; font-weight:600; background:rgba(148, 163, 184, 0.1); padding:2px 6px; border-radius:4px; border:1px solid rgba(148, 163, 184, 0.3);">{{ r.sentiment }}</span>
-                        {% else %}
-                          {{ r.sentiment }}
-                        {% endif %}
-                      </td>
-                      <td style="font-family:'Courier New', monospace; font-weight:600;">
-                        {% if r.polarity is not none %}{{ r.polarity }}{% else %}-{% endif %}
-                      </td>
-                      <td>{% if r.confidence is not none %}{{ r.confidence }}%{% else %}-{% endif %}</td>
-                      <td>
-                        {% if r.relevant == "Yes" %}
-                          <span style="color:#166534; font-weight:600;">{{ r.relevant }}</span>
-                        {% elif r.relevant == "No" %}
-                          <span style="color:#991b1b; font-weight:600;">{{ r.relevant }}</span>
-                        {% else %}
-                          {{ r.relevant }}
-                        {% endif %}
-                      </td>
-                    </tr>
-                  {% endfor %}
-                </tbody>
-              </table>
-            </div>
-          </div>
-        {% endif %}
-      {% endif %}
-    </div>
-  </body>
-</html>
-"""
-
-
-AUTH_TEMPLATE = """
-<!doctype html>
-<html>
-  <head>
-    <meta charset="utf-8">
-    <title>{{ page_title }}</title>
-    <style>
-      :root {
-        --bg-gradient-start: #dcfce7;
-        --bg-gradient-end: #dbeafe;
-        --primary: #8b5cf6;
-        --primary-hover: #a78bfa;
-        --text-main: #14532d;
-        --text-muted: #15803d;
-        --text-dark: #052e16;
-        --card-border: rgba(148, 163, 184, 0.15);
-      }
-
-      * {
-        box-sizing: border-box;
-      }
-
-      body {
-        margin: 0;
-        min-height: 100vh;
-        display: flex;
-        align-items: center;
-        justify-content: center;
-        font-family: system-ui, -apple-system, BlinkMacSystemFont, "SF Pro Text",
-                     "Segoe UI", sans-serif;
-        color: var(--text-main);
-        background: linear-gradient(135deg, var(--bg-gradient-start) 0%, #cffafe 50%, var(--bg-gradient-end) 100%);
-        padding: 24px 16px;
-      }
-
-      .shell {
-        width: 100%;
-        max-width: 440px;
-      }
-
-      .card {
-        background: #ffffff;
-        border-radius: 18px;
-        border: 1px solid var(--card-border);
-        box-shadow: 0 8px 24px rgba(0, 0, 0, 0.1);
-        padding: 24px 24px 20px;
-        backdrop-filter: blur(10px);
-      }
-
-      .title {
-        font-size: 24px;
-        font-weight: 700;
-        margin-bottom: 6px;
-        color: var(--text-dark);
-        letter-spacing: -0.01em;
-      }
-
-      .subtitle {
-        font-size: 13px;
-        color: var(--text-muted);
-        margin-bottom: 16px;
-      }
-
-      label {
-        display: block;
-        font-size: 13px;
-        color: var(--text-dark);
-        margin-bottom: 4px;
-        font-weight: 500;
-      }
-
-      input[type="text"],
-      input[type="password"] {
-        width: 100%;
-        padding: 10px 12px;
-        border-radius: 12px;
-        border: 1.5px solid rgba(148, 163, 184, 0.3);
-        background: #fafafa;
-        color: var(--text-dark);
-        font-size: 13px;
-        margin-bottom: 12px;
-        transition: all 0.2s ease;
-      }
-
-      input[type="text"]:focus-visible,
-      input[type="password"]:focus-visible {
-        outline: none;
-        border-color: var(--primary);
-        box-shadow: 0 0 0 3px rgba(139, 92, 246, 0.15), 0 2px 8px rgba(139, 92, 246, 0.1);
-        background: #ffffff;
-      }
-
-      .btn-primary {
-        width: 100%;
-        border: none;
-        cursor: pointer;
-        padding: 11px 18px;
-        border-radius: 999px;
-        font-size: 14px;
-        font-weight: 600;
-        color: #ffffff;
-        background: radial-gradient(circle at 0% 0%, rgba(167, 139, 250, 0.8) 0, transparent 60%),
-                    linear-gradient(135deg, var(--primary) 0%, #a78bfa 50%, var(--primary-hover) 100%);
-        box-shadow: 0 4px 14px rgba(139, 92, 246, 0.4), 0 2px 4px rgba(139, 92, 246, 0.2);
-        display: inline-flex;
-        align-items: center;
-        justify-content: center;
-        gap: 6px;
-        transition: all 0.2s ease;
-        margin-top: 6px;
-      }
-
-      .btn-primary:hover {
-        transform: translateY(-2px);
-        filter: brightness(1.08);
-        box-shadow: 0 6px 20px rgba(139, 92, 246, 0.5), 0 4px 8px rgba(139, 92, 246, 0.3);
-      }
-
-      .btn-primary:active {
-        transform: translateY(0);
-        box-shadow: 0 2px 10px rgba(139, 92, 246, 0.4);
-      }
-
-      .muted {
-        font-size: 12px;
-        color: var(--text-muted);
-        margin-top: 10px;
-        text-align: center;
-      }
-
-      .muted a {
-        color: #8b5cf6;
-        text-decoration: none;
-        font-weight: 600;
-      }
-
-      .muted a:hover {
-        text-decoration: underline;
-      }
-
-      .alert {
-        font-size: 12px;
-        border-radius: 10px;
-        padding: 7px 9px;
-        margin-bottom: 8px;
-      }
-
-      .alert-error {
-        background: linear-gradient(135deg, rgba(248, 113, 113, 0.15), rgba(220, 38, 38, 0.1));
-        border: 1px solid rgba(220, 38, 38, 0.4);
-        color: #991b1b;
-      }
-    </style>
-  </head>
-  <body>
-    <div class="shell">
-      <div class="card">
-        <div class="title">{{ heading }}</div>
-        <div class="subtitle">{{ subheading }}</div>
-
-        {% if error %}
-          <div class="alert alert-error">{{ error }}</div>
-        {% endif %}
-
-        <form method="post">
-          <label for="username">Username</label>
-          <input
-            id="username"
-            name="username"
-            type="text"
-            value="{{ username or '' }}"
-            autocomplete="username"
-            required
-          >
-
-          <label for="password">Password</label>
-          <input
-            id="password"
-            name="password"
-            type="password"
-            autocomplete="current-password"
-            required
-          >
-
-          <button class="btn-primary" type="submit">
-            <span>{{ button_label }}</span>
-          </button>
-        </form>
-
-        <div class="muted">
-          {{ footer_text | safe }}
-        </div>
-      </div>
-    </div>
-  </body>
-</html>
-"""
+        for review, sentiment, polarity, confidence, is_relevant in zip(
+            review_col[:wanted].tolist(),
+            cols["sentiment"],
+            cols["polarity"],
+            cols["confidence"],
+            cols["relevant"],
+        )
+    ]
+    return rows, sentiments.tolist(), polys
+
+
+# Placeholder values of the /api/analyze-batch rows that are not scored
+_API_IRRELEVANT_ROW: Final = {"sentiment": None, "polarity": None, "confidence": None, "relevant": False}
+_API_EMPTY_ROW: Final = {"sentiment": None, "polarity": None, "confidence": None, "relevant": None}
+
+
+# Placeholder values of the /batch table rows that are not scored
+_BATCH_IRRELEVANT_ROW: Final = {"sentiment": "Not analyzed", "polarity": None, "confidence": None, "relevant": "No"}
+_BATCH_EMPTY_ROW: Final = {"sentiment": "Neutral", "polarity": 0.0, "confidence": None, "relevant": "N/A"}
+
+
+def _analyze_api_column(column):
+    """
+    Relevance and sentiment for one column of CSV cells, analyzed as
+    str(value). Returns (results, sentiments, polarities): the
+    /api/analyze-batch row dicts (all None for empty cells) plus the labels
+    and rounded polarities of the relevant rows.
+    """
+    as_text = column.astype(str)
+    valid = (column.notna() & as_text.str.strip().ne("")).to_numpy(dtype=bool)
+    return _score_column(as_text, valid, True, _API_IRRELEVANT_ROW, _API_EMPTY_ROW)
+
+
+def _aspects_html(aspects) -> Markup:
+    """Pre-render the aspect rows of the single-review page in one join."""
+    return Markup("".join(
+        '<li class="aspect-row"><div class="aspect-main">'
+        f'<span class="aspect-label">{escape(a["aspect"])}</span>'
+        f'<span class="aspect-meta">{escape(a["sentiment"])} &nbsp;•&nbsp; '
+        f'polarity {a["polarity"]}, {a["confidence"]}%</span>'
+        + (f'<div class="aspect-evidence">{escape("; ".join(a["evidence"]))}</div>' if a["evidence"] else "")
+        + '</div><div class="aspect-pill">Aspect</div></li>'
+        for a in aspects
+    ))
+
+
+_SENTIMENT_SPAN_STYLES = {
+    "Positive": "color:#166534; font-weight:600; background:rgba(34, 197, 94, 0.1); padding:2px 6px; border-radius:4px; border:1px solid rgba(34, 197, 94, 0.3);",
+    "Negative": "color:#991b1b; font-weight:600; background:rgba(220, 38, 38, 0.1); padding:2px 6px; border-radius:4px; border:1px solid rgba(220, 38, 38, 0.3);",
+    "Neutral": "color:#475569; font-weight:600; background:rgba(148, 163, 184, 0.1); padding:2px 6px; border-radius:4px; border:1px solid rgba(148, 163, 184, 0.3);",
+}
+_RELEVANT_SPAN_STYLES = {
+    "Yes": "color:#166534; font-weight:600;",
+    "No": "color:#991b1b; font-weight:600;",
+}
+
+
+def _styled_cell(value, styles) -> str:
+    style = styles.get(value)
+    if style is None:
+        return str(escape(value))
+    return f'<span style="{style}">{escape(value)}</span>'
+
+
+def _rows_html(rows) -> Markup:
+    """Pre-render the sample-rows table body of the batch page in one join."""
+    return Markup("".join(
+        f'<tr><td>{escape(r["review"])}</td>'
+        f'<td>{_styled_cell(r["sentiment"], _SENTIMENT_SPAN_STYLES)}</td>'
+        """<td style="font-family:'Courier New', monospace; font-weight:600;">"""
+        f'{"-" if r["polarity"] is None else r["polarity"]}</td>'
+        f'<td>{"-" if r["confidence"] is None else str(r["confidence"]) + "%"}</td>'
+        f'<td>{_styled_cell(r["relevant"], _RELEVANT_SPAN_STYLES)}</td></tr>'
+        for r in rows
+    ))
+
+
+# Views that need a signed-in user; everyone else is sent to the login page
+_PROTECTED: Final = frozenset({"index", "batch"})
+
+
+@app.before_request
+def _require_login():
+    g.user = session.get("user")
+    if request.endpoint in _PROTECTED and not g.user:
+        return redirect(url_for("login"))
+
+
+# Template variables every render of the two analysis pages starts from
+_SINGLE_DEFAULTS: Final = {
+    "review_text": "",
+    "relevant": None,
+    "enforce_warning": False,
+    "sentiment": None,
+    "polarity": None,
+    "confidence": None,
+    "aspects": (),
+    "proceed_anyway": False,
+    "error": None,
+}
+_BATCH_DEFAULTS: Final = {
+    "summary": None,
+    "rows": None,
+    "error": None,
+}
+
+
+def _render_single(**context):
+    return render_template(
+        "single.html", **{**_SINGLE_DEFAULTS, "current_user": g.user, **context}
+    )
+
+
+def _render_batch(**context):
+    return render_template(
+        "batch.html", **{**_BATCH_DEFAULTS, "current_user": g.user, **context}
+    )
+
+
+def _dumps(obj) -> bytes:
+    """Serialize obj to JSON bytes with sorted keys, using orjson when installed."""
+    if orjson is None:
+        return json.dumps(obj, sort_keys=True).encode()
+    return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+MSGPACK_MIMETYPE = "application/msgpack"
+
+
+def ojsonify(obj):
+    """
+    jsonify for the API routes, serialized with orjson when it is installed.
+    Keys are sorted as Flask's own provider does. Clients that prefer
+    application/msgpack get the same object as MessagePack instead.
+    """
+    if (
+        msgpack is not None
+        and request.accept_mimetypes.best_match(["application/json", MSGPACK_MIMETYPE]) == MSGPACK_MIMETYPE
+    ):
+        return app.response_class(msgpack.packb(obj, use_bin_type=True), mimetype=MSGPACK_MIMETYPE)
+    if orjson is None:
+        return jsonify(obj)
+    return app.response_class(_dumps(obj), mimetype="application/json")
 
 
 @app.route("/login", methods=["GET", "POST"])
@@ -1629,7 +1065,7 @@ def login():
     Checks that the username exists in the database and that the
     password exactly matches the stored value.
     """
-    if session.get("user"):
+    if g.user:
         return redirect(url_for("index"))
 
     error = None
@@ -1649,8 +1085,8 @@ def login():
 
     footer_text = f'New here? <a href="{url_for("signup")}">Create an account</a>.'
 
-    return render_template_string(
-        AUTH_TEMPLATE,
+    return render_template(
+        "auth.html",
         page_title="Login",
         heading="Sign in",
         subheading="Use your account to access the smartwatch sentiment analyzer.",
@@ -1668,7 +1104,7 @@ def signup():
     First-time users must create an account here. Username must be
     unique and a non-empty password is required.
     """
-    if session.get("user"):
+    if g.user:
         return redirect(url_for("index"))
 
     error = None
@@ -1688,8 +1124,8 @@ def signup():
 
     footer_text = f'Already have an account? <a href="{url_for("login")}">Login</a>.'
 
-    return render_template_string(
-        AUTH_TEMPLATE,
+    return render_template(
+        "auth.html",
         page_title="Sign up",
         heading="Create an account",
         subheading="Set up a basic account for this smartwatch project (demo only).",
@@ -1714,49 +1150,43 @@ def index():
     Mirrors the Streamlit behaviour: relevance check, sentiment,
     polarity, confidence and aspect-level insights.
     """
-    if "user" not in session:
-        return redirect(url_for("login"))
-
-    context = {
-        "review_text": "",
-        "relevant": None,
-        "enforce_warning": False,
-        "sentiment": None,
-        "polarity": None,
-        "confidence": None,
-        "aspects": [],
-        "proceed_anyway": False,
-        "error": None,
-        "current_user": session.get("user"),
-    }
+    if request.method != "POST":
+        return _render_single()
 
-    if request.method == "POST":
-        review_text = (request.form.get("review_text") or "").strip()
-        proceed_anyway = bool(request.form.get("proceed_anyway"))
-        context["review_text"] = review_text
-        context["proceed_anyway"] = proceed_anyway
-
-        if not review_text:
-            context["error"] = "Please enter a review to analyze."
-            return render_template_string(SINGLE_TEMPLATE, **context)
+    review_text = (request.form.get("review_text") or "").strip()
+    proceed_anyway = bool(request.form.get("proceed_anyway"))
 
-        is_relevant = is_smartwatch_related(review_text)
-        context["relevant"] = is_relevant
+    if not review_text:
+        return _render_single(
+            review_text=review_text,
+            proceed_anyway=proceed_anyway,
+            error="Please enter a review to analyze.",
+        )
 
-        # If it doesn't look like a smartwatch review and user didn't opt in, stop here
-        if (not is_relevant) and (not proceed_anyway):
-            context["enforce_warning"] = True
-            return render_template_string(SINGLE_TEMPLATE, **context)
+    is_relevant = is_smartwatch_related(review_text)
 
-        sentiment, polarity = get_sentiment(review_text)
-        aspects = analyze_aspects(review_text)
+    # If it doesn't look like a smartwatch review and user didn't opt in, stop here
+    if (not is_relevant) and (not proceed_anyway):
+        return _render_single(
+            review_text=review_text,
+            proceed_anyway=proceed_anyway,
+            relevant=is_relevant,
+            enforce_warning=True,
+        )
 
-        context["sentiment"] = sentiment
-        context["polarity"] = round(polarity, 3)
-        context["confidence"] = get_confidence(polarity)
-        context["aspects"] = aspects
+    sentiment, polarity = get_sentiment(review_text)
+    aspects = analyze_aspects(review_text)
 
-    return render_template_string(SINGLE_TEMPLATE, **context)
+    return _render_single(
+        review_text=review_text,
+        proceed_anyway=proceed_anyway,
+        relevant=is_relevant,
+        sentiment=sentiment,
+        polarity=round(polarity, 3),
+        confidence=get_confidence(polarity),
+        aspects=aspects,
+        aspects_html=_aspects_html(aspects),
+    )
 
 
 @app.route("/batch", methods=["GET", "POST"])
@@ -1766,125 +1196,78 @@ def batch():
     Reuses the same logic as the /api/analyze-batch endpoint, but
     renders a very simple page with summary + sample rows.
     """
-    if "user" not in session:
-        return redirect(url_for("login"))
-
-    context = {
-        "summary": None,
-        "rows": None,
-        "error": None,
-        "current_user": session.get("user"),
-    }
-
     if request.method == "POST":
         file = request.files.get("file")
         text_column = request.form.get("text_column") or None
+        # ?no_table=1 skips building the sample rows for summary-only callers
+        table_rows = 0 if request.args.get("no_table") == "1" else BATCH_TABLE_ROWS
 
         if file is None or file.filename == "":
-            context["error"] = "Please upload a CSV file."
-            return render_template_string(BATCH_TEMPLATE, **context)
+            return _render_batch(error="Please upload a CSV file.")
 
-        try:
-            df = pd.read_csv(file)
-        except Exception as exc:
-            context["error"] = f"Could not read CSV: {exc}"
-            return render_template_string(BATCH_TEMPLATE, **context)
-
-        text_columns = [c for c in df.columns if df[c].dtype == "object"]
-        if not text_columns:
-            context["error"] = "No text-like columns found in the CSV."
-            return render_template_string(BATCH_TEMPLATE, **context)
-
-        if text_column:
-            if text_column not in df.columns:
-                context["error"] = f"text_column '{text_column}' not found."
-                return render_template_string(BATCH_TEMPLATE, **context)
-            text_col = text_column
-        else:
-            preferred = ["reviews.text", "text", "review", "reviews", "comment", "comments"]
-            text_col = None
-            for col in preferred:
-                if col in text_columns:
-                    text_col = col
-                    break
-            if text_col is None:
-                text_col = text_columns[0]
+        # pandas is imported here rather than at startup: only batch uploads need it
+        import pandas as pd
 
-        results = []
+        text_col, text_dtype, error = _resolve_text_column(file, text_column)
+        if error:
+            return _render_batch(error=error)
+
+        total_rows = 0
         relevant_count = 0
         irrelevant_count = 0
+        sentiment_counts = {"Positive": 0, "Neutral": 0, "Negative": 0}
+        polarity_sum = 0.0
+        results = []
 
-        for raw in df[text_col]:
-            if pd.notna(raw) and str(raw).strip():
-                review_str = str(raw)
-                is_relevant = is_smartwatch_related(review_str)
-                if is_relevant:
-                    relevant_count += 1
-                    sentiment, polarity = get_sentiment(review_str)
-                    results.append(
-                        {
-                            "review": review_str,
-                            "sentiment": sentiment,
-                            "polarity": round(polarity, 3),
-                            "confidence": get_confidence(polarity),
-                            "relevant": "Yes",
-                        }
-                    )
-                else:
-                    irrelevant_count += 1
-                    results.append(
-                        {
-                            "review": review_str,
-                            "sentiment": "Not analyzed",
-                            "polarity": None,
-                            "confidence": None,
-                            "relevant": "No",
-                        }
-                    )
-            else:
-                results.append(
-                    {
-                        "review": None,
-                        "sentiment": "Neutral",
-                        "polarity": 0.0,
-                        "confidence": None,
-                        "relevant": "N/A",
-                    }
+        file.seek(0)
+        try:
+            for column in _read_text_column(file, text_col, text_dtype):
+                column = column.astype("string")
+                total_rows += len(column)
+
+                valid = (column.notna() & column.str.strip().ne("")).fillna(False).to_numpy(dtype=bool)
+                # Per-row dicts are only built for the rows the table shows
+                rows, sentiments, rounded = _score_column(
+                    column,
+                    valid,
+                    "Yes",
+                    _BATCH_IRRELEVANT_ROW,
+                    _BATCH_EMPTY_ROW,
+                    limit=table_rows - len(results),
                 )
+                results.extend(rows)
 
-        # Compute summary on relevant reviews only
-        relevant_reviews = [r for r in results if r["relevant"] == "Yes"]
-        sentiment_counts = {"Positive": 0, "Neutral": 0, "Negative": 0}
-        avg_polarity = None
-
-        if relevant_reviews:
-            polys = []
-            for r in relevant_reviews:
-                s = r["sentiment"]
-                if s in sentiment_counts:
-                    sentiment_counts[s] += 1
-                if r["polarity"] is not None:
-                    polys.append(r["polarity"])
-            if polys:
-                avg_polarity = round(sum(polys) / len(polys), 3)
-
-        context["summary"] = {
-            "total_rows": len(df),
+                non_empty = int(valid.sum())
+                relevant_count += len(rounded)
+                irrelevant_count += non_empty - len(rounded)
+                _count_sentiments(sentiments, sentiment_counts)
+                polarity_sum += sum(rounded)
+        except (pd.errors.ParserError, UnicodeDecodeError) as exc:
+            return _render_batch(error=f"Could not read CSV: {exc}")
+
+        avg_polarity = round(polarity_sum / relevant_count, 3) if relevant_count else None
+
+        summary = {
+            "total_rows": total_rows,
             "text_column": text_col,
             "relevant_count": relevant_count,
             "irrelevant_count": irrelevant_count,
             "sentiment_distribution": sentiment_counts,
             "average_polarity": avg_polarity,
         }
-        # Show up to first 200 rows in the HTML table for simplicity
-        context["rows"] = results[:200]
+        # Script clients asking for JSON get the same data without the page
+        if request.accept_mimetypes.best_match(["text/html", "application/json"]) == "application/json":
+            return ojsonify({"summary": summary, "rows": results})
+
+        # Show up to first BATCH_TABLE_ROWS rows in the HTML table for simplicity
+        return _render_batch(summary=summary, rows=results, rows_html=_rows_html(results))
 
-    return render_template_string(BATCH_TEMPLATE, **context)
+    return _render_batch()
 
 
 @app.get("/api/health")
 def health():
-    return jsonify({"status": "ok"})
+    return ojsonify({"status": "ok"})
 
 
 @app.post("/api/analyze-review")
@@ -1901,12 +1284,12 @@ def api_analyze_review():
     enforce = data.get("enforce_smartwatch", True)
 
     if not review_text:
-        return jsonify({"error": "Field 'text' is required."}), 400
+        return ojsonify({"error": "Field 'text' is required."}), 400
 
     is_relevant = is_smartwatch_related(review_text)
     if enforce and not is_relevant:
         return (
-            jsonify(
+            ojsonify(
                 {
                     "relevant": False,
                     "message": "Text does not appear to be a smartwatch/product review.",
@@ -1918,7 +1301,7 @@ def api_analyze_review():
     sentiment, polarity = get_sentiment(review_text)
     aspects = analyze_aspects(review_text)
 
-    return jsonify(
+    return ojsonify(
         {
             "relevant": bool(is_relevant),
             "sentiment": sentiment,
@@ -1929,6 +1312,76 @@ def api_analyze_review():
     )
 
 
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+# Streamed uploads are copied to memory up to this size, then to disk
+# (Werkzeug's own threshold for spooling uploads)
+UPLOAD_SPOOL_MAXSIZE = 500 * 1024
+
+
+def _batch_summary(total_rows, text_col, non_empty, sentiment_counts, polarity_sum, relevant_count):
+    """
+    The /api/analyze-batch summary: non_empty counts rows with review text;
+    sentiment_counts and polarity_sum (of rounded polarities) cover the
+    relevant_count relevant rows.
+    """
+    return {
+        "total_rows": total_rows,
+        "text_column": text_col,
+        "relevant_count": relevant_count,
+        "irrelevant_count": non_empty - relevant_count,
+        "sentiment_distribution": sentiment_counts,
+        "average_polarity": round(polarity_sum / relevant_count, 3) if relevant_count else None,
+    }
+
+
+def _copy_upload(file):
+    """
+    Copy an uploaded file into a spooled temporary file the caller owns.
+    Flask closes the upload when the view returns, before a streamed
+    response body is read.
+    """
+    copy = tempfile.SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MAXSIZE)
+    shutil.copyfileobj(file.stream, copy)
+    copy.seek(0)
+    return copy
+
+
+def _stream_batch_ndjson(file, columns, text_col):
+    """
+    NDJSON lines for /api/analyze-batch from the column chunks read out of
+    file; closes file when done.
+    """
+    import pandas as pd
+
+    # Running totals only, so memory stays bounded by the chunk size
+    total_rows = 0
+    non_empty = 0
+    sentiment_counts = {"Positive": 0, "Neutral": 0, "Negative": 0}
+    polarity_sum = 0.0
+    relevant_count = 0
+    try:
+        for column in columns:
+            results, chunk_sentiments, chunk_polys = _analyze_api_column(column)
+            total_rows += len(results)
+            non_empty += sum(r["review"] is not None for r in results)
+            _count_sentiments(chunk_sentiments, sentiment_counts)
+            polarity_sum += sum(chunk_polys)
+            relevant_count += len(chunk_polys)
+            yield b"".join(_dumps(r) + b"\n" for r in results)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as exc:
+        # The 200 status is already sent; end with an error line instead of the summary
+        yield _dumps({"error": f"Could not read CSV: {exc}"}) + b"\n"
+        return
+    finally:
+        file.close()
+
+    summary = _batch_summary(
+        total_rows, text_col, non_empty, sentiment_counts, polarity_sum, relevant_count
+    )
+    yield _dumps({"summary": summary}) + b"\n"
+
+
 @app.post("/api/analyze-batch")
 def api_analyze_batch():
     """
@@ -1937,119 +1390,77 @@ def api_analyze_batch():
       - text_column: optional, column name with review text
     """
     if "file" not in request.files:
-        return jsonify({"error": "No file uploaded under field 'file'."}), 400
+        return ojsonify({"error": "No file uploaded under field 'file'."}), 400
 
     file = request.files["file"]
     if file.filename == "":
-        return jsonify({"error": "Uploaded file has no name."}), 400
+        return ojsonify({"error": "Uploaded file has no name."}), 400
+
+    import pandas as pd
+
+    # Clients accepting NDJSON get one line per row as each chunk is scored,
+    # then a final {"summary": ...} line, instead of one buffered document
+    if request.accept_mimetypes.best_match(["application/json", NDJSON_MIMETYPE]) == NDJSON_MIMETYPE:
+        text_col, text_dtype, error = _resolve_text_column(file, request.form.get("text_column"))
+        if error:
+            return ojsonify({"error": error}), 400
+
+        # The first chunk is read before the 200 status goes out, so a file
+        # that fails there gets the same 400 as the buffered response
+        upload = _copy_upload(file)
+        columns = _read_text_column(upload, text_col, text_dtype)
+        try:
+            first = next(columns, None)
+        except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as exc:
+            upload.close()
+            return ojsonify({"error": f"Could not read CSV: {exc}"}), 400
+        if first is not None:
+            columns = itertools.chain([first], columns)
+        return app.response_class(
+            _stream_batch_ndjson(upload, columns, text_col),
+            mimetype=NDJSON_MIMETYPE,
+        )
 
     try:
         df = pd.read_csv(file)
     except Exception as exc:
-        return jsonify({"error": f"Could not read CSV: {exc}"}), 400
+        return ojsonify({"error": f"Could not read CSV: {exc}"}), 400
 
     # Choose text column
     requested_col = request.form.get("text_column")
-    text_columns = [c for c in df.columns if df[c].dtype == "object"]
+    text_columns = list(df.select_dtypes(include=["object", "string"]).columns)
 
     if not text_columns:
-        return jsonify({"error": "No text-like columns found in the CSV."}), 400
+        return ojsonify({"error": "No text-like columns found in the CSV."}), 400
 
     if requested_col:
         if requested_col not in df.columns:
-            return jsonify({"error": f"text_column '{requested_col}' not found."}), 400
+            return ojsonify({"error": f"text_column '{requested_col}' not found."}), 400
         text_col = requested_col
     else:
         # Auto-detect if not provided
-        preferred = ["reviews.text", "text", "review", "reviews", "comment", "comments"]
-        text_col = None
-        for col in preferred:
-            if col in text_columns:
-                text_col = col
-                break
-        if text_col is None:
-            text_col = text_columns[0]
-
-    results = []
-    relevant_count = 0
-    irrelevant_count = 0
-
-    for raw in df[text_col]:
-        if pd.notna(raw) and str(raw).strip():
-            review_str = str(raw)
-            is_relevant = is_smartwatch_related(review_str)
-            if is_relevant:
-                relevant_count += 1
-                sentiment, polarity = get_sentiment(review_str)
-                results.append(
-                    {
-                        "review": review_str,
-                        "sentiment": sentiment,
-                        "polarity": round(polarity, 3),
-                        "confidence": get_confidence(polarity),
-                        "relevant": True,
-                    }
-                )
-            else:
-                irrelevant_count += 1
-                results.append(
-                    {
-                        "review": review_str,
-                        "sentiment": None,
-                        "polarity": None,
-                        "confidence": None,
-                        "relevant": False,
-                    }
-                )
-        else:
-            results.append(
-                {
-                    "review": None,
-                    "sentiment": None,
-                    "polarity": None,
-                    "confidence": None,
-                    "relevant": None,
-                }
-            )
+        text_column_set = set(text_columns)
+        text_col = next((col for col in PREFERRED_TEXT_COLUMNS if col in text_column_set), text_columns[0])
 
-    # Compute simple stats on relevant reviews
-    relevant_reviews = [r for r in results if r["relevant"]]
-    sentiment_counts = {"Positive": 0, "Neutral": 0, "Negative": 0}
-    avg_polarity = None
-
-    if relevant_reviews:
-        polys = []
-        for r in relevant_reviews:
-            s = r["sentiment"]
-            if s in sentiment_counts:
-                sentiment_counts[s] += 1
-            if r["polarity"] is not None:
-                polys.append(r["polarity"])
-        if polys:
-            avg_polarity = round(sum(polys) / len(polys), 3)
-
-    summary = {
-        "total_rows": len(df),
-        "text_column": text_col,
-        "relevant_count": relevant_count,
-        "irrelevant_count": irrelevant_count,
-        "sentiment_distribution": sentiment_counts,
-        "average_polarity": avg_polarity,
-    }
+    results, sentiments, polys = _analyze_api_column(df[text_col])
+    non_empty = sum(r["review"] is not None for r in results)
+    summary = _batch_summary(
+        len(df), text_col, non_empty, _count_sentiments(sentiments), sum(polys), len(polys)
+    )
 
-    return jsonify({"summary": summary, "results": results})
+    return ojsonify({"summary": summary, "results": results})
 
 
 def _open_browser():
-    """Open the default web browser to the main page after a short delay."""
-    time.sleep(1.0)
+    """Open the default web browser to the main page."""
     webbrowser.open("http://127.0.0.1:5000/")
 
 
 if __name__ == "__main__":
-    # Only auto-open the browser for the reloader main process to avoid double-open
-    if os.environ.get("WERKZEUG_RUN_MAIN") == "true":
-        threading.Thread(target=_open_browser, daemon=True).start()
+    # The reloader re-runs this file in a child process (WERKZEUG_RUN_MAIN=true)
+    # after every code change; only the outer process opens the browser
+    if os.environ.get("WERKZEUG_RUN_MAIN") != "true":
+        threading.Timer(1.0, _open_browser).start()
 
     app.run(host="0.0.0.0", port=5000, debug=True)
 
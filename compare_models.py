@@ -1,11 +1,15 @@
 """
-Compare accuracy of the classical TF‑IDF + Logistic Regression model
+Compare accuracy of the classical TF‑IDF + linear model (Logistic Regression,
+or SGD for large training sets; see train_classical.py)
 vs. the Transformer (DistilBERT) on the same smartwatch sentiment test set.
 
 Run from project root:
     python scripts/compare_models.py
 """
 
+import contextlib
+import hashlib
+import itertools
 import os
 
 import joblib
@@ -16,11 +20,26 @@ from sklearn.model_selection import train_test_split
 from transformers import AutoModelForSequenceClassification, AutoTokenizer
 import torch
 
+try:
+    from optimum.onnxruntime import ORTModelForSequenceClassification, ORTQuantizer
+    from optimum.onnxruntime.configuration import AutoQuantizationConfig
+except ImportError:  # optional: CPU evaluation stays on PyTorch
+    ORTModelForSequenceClassification = None
+
 
 DATA_PATH = "data/smartwatch_labeled.csv"
 CLASSICAL_MODEL_PATH = "classical_model.pkl"
 TFIDF_PATH = "tfidf_vectorizer.pkl"
 TRANSFORMER_DIR = "models/transformer_distilbert"
+MAX_LENGTH = 256
+BATCH_SIZE_GPU = 64
+BATCH_SIZE_CPU = 16
+ONNX_INT8_DIR = "models/transformer_distilbert_onnx_int8"
+TOKEN_CACHE_DIR = "cache"
+
+# Small-batch CPU inference: all cores inside each op, no inter-op pool
+torch.set_num_threads(os.cpu_count() or 1)
+torch.set_num_interop_threads(1)
 
 
 def load_data():
@@ -44,7 +63,7 @@ def evaluate_classical(X_test, y_test):
 
     acc = accuracy_score(y_test, preds)
     print("=" * 70)
-    print("CLASSICAL MODEL (TF‑IDF + Logistic Regression)")
+    print(f"CLASSICAL MODEL (TF‑IDF + {type(model).__name__})")
     print("=" * 70)
     print(f"\nAccuracy: {acc:.4f} ({acc*100:.2f}%)")
     print("\nClassification report:\n", classification_report(y_test, preds))
@@ -53,6 +72,50 @@ def evaluate_classical(X_test, y_test):
     return acc
 
 
+def export_onnx_int8(model_dir=TRANSFORMER_DIR, out_dir=ONNX_INT8_DIR):
+    """
+    Export the fine-tuned model to ONNX with dynamic int8 quantization and
+    load it with ONNX Runtime. The export is redone only when model_dir has
+    been retrained since the last one.
+    """
+    config_path = os.path.join(model_dir, "config.json")
+    quantized_path = os.path.join(out_dir, "model_quantized.onnx")
+    if not os.path.exists(quantized_path) or os.path.getmtime(quantized_path) < os.path.getmtime(config_path):
+        print("Exporting", model_dir, "to int8 ONNX in", out_dir)
+        ort_model = ORTModelForSequenceClassification.from_pretrained(model_dir, export=True)
+        quantizer = ORTQuantizer.from_pretrained(ort_model)
+        qconfig = AutoQuantizationConfig.avx512_vnni(is_static=False, per_channel=False)
+        quantizer.quantize(save_dir=out_dir, quantization_config=qconfig)
+
+    return ORTModelForSequenceClassification.from_pretrained(out_dir, file_name="model_quantized.onnx")
+
+
+def tokenize_cached(tokenizer, texts):
+    """
+    Truncated, unpadded token ids for each text. The test split is
+    deterministic, so they are saved to TOKEN_CACHE_DIR on the first run
+    and loaded from there afterwards instead of re-tokenizing.
+    """
+    key = hashlib.sha1(f"{tokenizer.name_or_path}|{len(tokenizer)}|{MAX_LENGTH}".encode("utf-8"))
+    for text in texts:
+        key.update(b"\0" + text.encode("utf-8"))
+    path = os.path.join(TOKEN_CACHE_DIR, key.hexdigest() + ".npz")
+
+    if os.path.exists(path):
+        with np.load(path) as cached:
+            ids, offsets = cached["input_ids"], cached["offsets"]
+    else:
+        input_ids = tokenizer(texts, truncation=True, max_length=MAX_LENGTH)["input_ids"]
+        # Reviews differ in length: store one flat int32 array plus offsets
+        offsets = np.zeros(len(input_ids) + 1, dtype=np.int64)
+        np.cumsum([len(seq) for seq in input_ids], out=offsets[1:])
+        ids = np.fromiter(itertools.chain.from_iterable(input_ids), dtype=np.int32, count=offsets[-1])
+        os.makedirs(TOKEN_CACHE_DIR, exist_ok=True)
+        np.savez(path, input_ids=ids, offsets=offsets)
+
+    return [ids[offsets[i]:offsets[i + 1]] for i in range(len(texts))]
+
+
 def evaluate_transformer(X_test, y_test):
     if not os.path.isdir(TRANSFORMER_DIR):
         raise FileNotFoundError(
@@ -60,29 +123,61 @@ def evaluate_transformer(X_test, y_test):
             "Train it first with: python scripts/train_transformer.py"
         )
 
-    tokenizer = AutoTokenizer.from_pretrained(TRANSFORMER_DIR)
-    model = AutoModelForSequenceClassification.from_pretrained(TRANSFORMER_DIR)
-    model.eval()
-
+    # The Rust-backed tokenizer batches far faster than the Python one
+    tokenizer = AutoTokenizer.from_pretrained(TRANSFORMER_DIR, use_fast=True)
+    if not tokenizer.is_fast:
+        print("Warning: no fast tokenizer found in", TRANSFORMER_DIR, "- tokenization will be slow")
     device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-    model.to(device)
-
-    all_preds = []
-
-    with torch.no_grad():
-        for text in X_test:
-            enc = tokenizer(
-                text,
-                padding="max_length",
-                truncation=True,
-                max_length=256,
+    on_gpu = device.type == "cuda"
+
+    # Without a GPU, run the int8 ONNX Runtime export when optimum is installed
+    if not on_gpu and ORTModelForSequenceClassification is not None:
+        model = export_onnx_int8()
+        backend = "ONNX Runtime int8"
+    else:
+        # PyTorch's fused scaled_dot_product_attention kernels (flash /
+        # memory-efficient on CUDA) instead of the eager matmul-softmax path
+        model = AutoModelForSequenceClassification.from_pretrained(TRANSFORMER_DIR, attn_implementation="sdpa")
+        model.eval()
+        model.to(device)
+        backend = f"PyTorch, {model.config._attn_implementation} attention"
+
+    batch_size = BATCH_SIZE_GPU if on_gpu else BATCH_SIZE_CPU
+    # fp16 matmuls on GPU; CPU stays in fp32
+    autocast = torch.autocast(device_type="cuda", dtype=torch.float16) if on_gpu else contextlib.nullcontext()
+    if on_gpu:
+        # Fused kernels for the forward pass. Batch shapes vary with review
+        # length, so compile for dynamic shapes rather than capturing CUDA
+        # graphs ("reduce-overhead") that would be re-recorded per shape
+        model = torch.compile(model, dynamic=True)
+
+    # Identical reviews (boilerplate, "Great product!") go through the model once
+    index_of = {}
+    inverse = np.array([index_of.setdefault(text, len(index_of)) for text in X_test], dtype=np.int64)
+    unique_texts = list(index_of)
+    token_ids = tokenize_cached(tokenizer, unique_texts)
+
+    # Batch reviews of similar token length together so padding=True (pad to
+    # the longest review in the batch, not to MAX_LENGTH) wastes little work
+    order = np.argsort([len(ids) for ids in token_ids], kind="stable")
+    unique_preds = np.empty(len(unique_texts), dtype=np.int64)
+
+    with torch.inference_mode(), autocast:
+        for start in range(0, len(order), batch_size):
+            batch_idx = order[start:start + batch_size]
+            enc = tokenizer.pad(
+                {"input_ids": [token_ids[i].tolist() for i in batch_idx]},
+                padding=True,
+                # Multiples of 8 suit fp16 tensor cores and limit distinct shapes
+                pad_to_multiple_of=8 if on_gpu else None,
                 return_tensors="pt",
             )
             enc = {k: v.to(device) for k, v in enc.items()}
             outputs = model(**enc)
             logits = outputs.logits
-            pred_id = int(torch.argmax(logits, dim=-1).cpu().item())
-            all_preds.append(pred_id)
+            unique_preds[batch_idx] = torch.argmax(logits, dim=-1).cpu().numpy()
+
+    all_preds = unique_preds[inverse]
 
     # Map true labels to ids to compare with predictions
     unique_labels = sorted(pd.Series(y_test).unique())
@@ -90,11 +185,11 @@ def evaluate_transformer(X_test, y_test):
     id2label = {i: lab for lab, i in label2id.items()}
 
     y_true = np.array([label2id[lab] for lab in y_test])
-    preds = np.array(all_preds)
+    preds = all_preds
 
     acc = accuracy_score(y_true, preds)
     print("=" * 70)
-    print("TRANSFORMER MODEL (DistilBERT)")
+    print(f"TRANSFORMER MODEL (DistilBERT, {backend})")
     print("=" * 70)
     target_names = [id2label[i] for i in sorted(id2label.keys())]
     print(f"\nAccuracy: {acc:.4f} ({acc*100:.2f}%)")
@@ -124,8 +219,8 @@ def main():
     print("\n" + "=" * 70)
     print("ACCURACY COMPARISON")
     print("=" * 70)
-    print(f"Classical TF‑IDF + Logistic Regression: {acc_classical*100:.2f}%")
-    print(f"Transformer (DistilBERT):              {acc_transformer*100:.2f}%")
+    print(f"Classical (TF‑IDF + linear model): {acc_classical*100:.2f}%")
+    print(f"Transformer (DistilBERT):          {acc_transformer*100:.2f}%")
 
 
 if __name__ == "__main__":
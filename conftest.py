@@ -0,0 +1,9 @@
+"""
+Lets the tests under tests/ import app.py from the project root, with the
+auth database in a scratch directory instead of the committed auth.db.
+"""
+
+import os
+import tempfile
+
+os.environ.setdefault("AUTH_DB_PATH", os.path.join(tempfile.mkdtemp(), "auth.db"))
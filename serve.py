@@ -0,0 +1,35 @@
+"""
+Serve the Flask app with Waitress, a multi-threaded WSGI server, so
+several reviews and logins can be handled at the same time.
+(`python app.py` still starts the single-user development server.)
+
+Run from project root:
+    python serve.py
+"""
+
+import os
+
+from waitress import serve
+
+from app import app
+
+
+HOST = "0.0.0.0"
+PORT = 5000
+THREADS = int(os.environ.get("WAITRESS_THREADS", "8"))
+
+
+def main():
+    # Templates are read from disk once per process; don't stat them per request
+    app.config["TEMPLATES_AUTO_RELOAD"] = False
+    app.jinja_env.auto_reload = False
+    # Compile (or load from the bytecode cache) every page template now rather
+    # than on the first request that renders each one
+    for name in app.jinja_env.list_templates(extensions=["html"]):
+        app.jinja_env.get_template(name)
+    print(f"Serving on http://127.0.0.1:{PORT}/ with {THREADS} threads")
+    serve(app, host=HOST, port=PORT, threads=THREADS)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Password hashing and the in-process login caches. Run from project root:
+    python -m pytest -q
+"""
+
+import threading
+from collections import OrderedDict
+
+import pytest
+
+import app as app_module
+from app import app, create_user, validate_user
+
+
+@pytest.fixture(autouse=True)
+def auth_db(tmp_path, monkeypatch):
+    """A fresh users table and empty caches, instead of the project's auth.db."""
+    monkeypatch.setattr(app_module, "DB_PATH", str(tmp_path / "auth.db"))
+    monkeypatch.setattr(app_module, "_db_local", threading.local())
+    monkeypatch.setattr(app_module, "_user_cache", {})
+    monkeypatch.setattr(app_module, "_verified", OrderedDict())
+    app_module.init_auth_db()
+
+
+def stored_password(username):
+    row = app_module._get_db().execute(
+        "SELECT password FROM users WHERE username = ?", (username,)
+    ).fetchone()
+    return row["password"]
+
+
+def test_signup_stores_a_scrypt_hash_and_login_accepts_it():
+    assert create_user("alice", "s3cret")
+    stored = stored_password("alice")
+    assert stored.startswith("scrypt$")
+    assert "s3cret" not in stored
+
+    res = app.test_client().post("/login", data={"username": "alice", "password": "s3cret"})
+    assert res.status_code == 302
+    assert res.headers["Location"] == "/"
+
+
+def test_wrong_password_is_rejected_after_a_remembered_login():
+    create_user("alice", "s3cret")
+    assert validate_user("alice", "s3cret")
+    assert "alice" in app_module._verified
+    assert not validate_user("alice", "wrong")
+    assert not validate_user("alice", "s3cret ")
+    assert validate_user("alice", "s3cret")
+
+
+def test_legacy_plain_password_is_upgraded_on_login():
+    app_module._get_db().execute(
+        "INSERT INTO users (username, password) VALUES (?, ?)", ("carol", "plain")
+    )
+    assert not validate_user("carol", "wrong")
+    assert validate_user("carol", "plain")
+    app_module._db_writer.submit(lambda: None).result()  # wait for the rehash
+    assert stored_password("carol").startswith("scrypt$")
+
+    app_module._verified.clear()
+    assert validate_user("carol", "plain")
+    assert not validate_user("carol", "wrong")
+
+
+def test_queued_upgrade_leaves_a_changed_password_alone():
+    app_module._get_db().execute(
+        "INSERT INTO users (username, password) VALUES (?, ?)", ("carol", "plain")
+    )
+    release = threading.Event()
+    app_module._db_writer.submit(release.wait)  # hold the writer thread
+    assert validate_user("carol", "plain")  # queues the rehash
+
+    # The password changes before the queued rehash runs
+    changed = app_module.hash_password("new")
+    app_module._get_db().execute(
+        "UPDATE users SET password = ? WHERE username = ?", (changed, "carol")
+    )
+    app_module._user_cache["carol"] = changed
+    release.set()
+    app_module._db_writer.submit(lambda: None).result()
+
+    assert stored_password("carol") == changed
+    assert app_module._user_cache["carol"] == changed
@@ -0,0 +1,120 @@
+"""
+CSV parsing for the batch endpoints. Run from project root:
+    python -m pytest -q
+"""
+
+import io
+import json
+
+import pytest
+
+from app import app
+
+
+@pytest.fixture
+def client():
+    return app.test_client()
+
+
+def post_csv(client, body, text_column="", accept="application/json"):
+    return client.post(
+        "/api/analyze-batch",
+        data={"file": (io.BytesIO(body), "reviews.csv"), "text_column": text_column},
+        content_type="multipart/form-data",
+        headers={"Accept": accept},
+    )
+
+
+@pytest.mark.parametrize("body, text_col", [(b"id,text\n", "text"), (b"id,body\n", "id")])
+def test_header_only_csv_gives_empty_result(client, body, text_col):
+    res = post_csv(client, body)
+    assert res.status_code == 200
+    payload = res.get_json()
+    assert payload["results"] == []
+    assert payload["summary"]["total_rows"] == 0
+    assert payload["summary"]["text_column"] == text_col
+
+
+def test_header_only_csv_streams_empty_summary(client):
+    res = post_csv(client, b"id,body\n", accept="application/x-ndjson")
+    assert res.status_code == 200
+    lines = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+    assert lines == [
+        {
+            "summary": {
+                "total_rows": 0,
+                "text_column": "id",
+                "relevant_count": 0,
+                "irrelevant_count": 0,
+                "sentiment_distribution": {"Positive": 0, "Neutral": 0, "Negative": 0},
+                "average_polarity": None,
+            }
+        }
+    ]
+
+
+@pytest.mark.parametrize("accept", ["application/json", "application/x-ndjson"])
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'review\n"my watch battery\nlasts a day\n',  # unterminated quote
+        b"id,body\n1,my watch\n2,great,watch\n",  # extra field, no preferred column name
+        b"id,text\n1,my watch\n2,great,watch\n",  # extra field in the first streamed chunk
+    ],
+)
+def test_malformed_csv_is_rejected(client, body, accept):
+    res = post_csv(client, body, accept=accept)
+    assert res.status_code == 400
+    assert res.get_json()["error"].startswith("Could not read CSV: Error tokenizing data. C error")
+
+
+def test_stream_ends_with_error_line_when_a_later_chunk_is_malformed(client, monkeypatch):
+    monkeypatch.setattr("app.BATCH_CSV_CHUNKSIZE", 2)
+    body = b"text,stars\nmy watch is great,5\nbattery died,1\nnice strap,4\nstrap broke,fast,2\n"
+    res = post_csv(client, body, accept="application/x-ndjson")
+    assert res.status_code == 200
+    lines = [json.loads(line) for line in res.get_data(as_text=True).splitlines()]
+    assert [line["review"] for line in lines[:-1]] == ["my watch is great", "battery died"]
+    assert lines[-1] == {
+        "error": "Could not read CSV: Error tokenizing data. C error: Expected 2 fields in line 5, saw 3\n"
+    }
+    assert post_csv(client, body).get_json() == {"error": lines[-1]["error"]}
+
+
+def test_streamed_read_parses_only_the_text_column(monkeypatch):
+    import pandas as pd
+
+    from app import _read_text_column
+
+    usecols = []
+    read_csv = pd.read_csv
+    monkeypatch.setattr(pd, "read_csv", lambda *a, **kw: usecols.append(kw.get("usecols")) or read_csv(*a, **kw))
+    body = io.BytesIO(b"id,text,stars\n1,my watch,5\n2,nice strap,4\n")
+    columns = list(_read_text_column(body, "text", "string"))
+    assert usecols == [["text"]]
+    assert [column.tolist() for column in columns] == [["my watch", "nice strap"]]
+
+
+def test_batch_page_rejects_rows_with_surplus_fields(client):
+    with client.session_transaction() as sess:
+        sess["user"] = "tester"
+    res = client.post(
+        "/batch",
+        data={"file": (io.BytesIO(b"id,text\n1,my watch\n2,great,watch\n"), "reviews.csv")},
+        content_type="multipart/form-data",
+    )
+    assert res.status_code == 200
+    assert b"Could not read CSV: Error tokenizing data. C error: Expected 2 fields in line 3, saw 3" in res.data
+
+
+def test_candidate_columns_are_typed_chunk_by_chunk(monkeypatch):
+    from app import _resolve_text_column
+
+    monkeypatch.setattr("app.BATCH_CSV_CHUNKSIZE", 2)
+    # "review" only holds text from its third row on; a whole-file read calls it text too
+    body = b"review,stars\n1,5\n2,4\nmy watch broke,1\n"
+    assert _resolve_text_column(io.BytesIO(body)) == ("review", "string", None)
+    # A non-text column asked for by name keeps the whole-file dtype
+    body = b"text,stars\nok,1\nfine,2\ngood,2.5\n"
+    text_col, dtype, error = _resolve_text_column(io.BytesIO(body), "stars")
+    assert (text_col, str(dtype), error) == ("stars", "float64", None)
@@ -0,0 +1,137 @@
+"""
+Vectorized and fallback code paths against their scalar counterparts.
+Run from project root:
+    python -m pytest -q
+"""
+
+from collections import Counter
+
+import numpy as np
+import pytest
+
+import app as app_module
+from app import (
+    ASPECT_KEYWORDS,
+    REVIEW_PATTERNS,
+    SMARTWATCH_KEYWORDS,
+    _BATCH_EMPTY_ROW,
+    _BATCH_IRRELEVANT_ROW,
+    _score_column,
+    app,
+    get_confidence,
+    get_confidence_batch,
+    get_sentiment,
+    is_smartwatch_related,
+    round_polarity_batch,
+)
+
+TEXTS = [
+    "my smart watch stars: 5 stars, the smartwatch watch band is great",
+    "battery lasts all day but the heart rate tracking is off",
+    "no keywords here at all",
+    "",
+    "watchwatch fitness trackers wearables",
+]
+
+PHRASE_SETS = [
+    SMARTWATCH_KEYWORDS,
+    REVIEW_PATTERNS,
+    {keyword: aspect for aspect, keywords in ASPECT_KEYWORDS.items() for keyword in keywords},
+    {"star", "stars", "tar", "a"},
+]
+
+
+def every_occurrence(phrases, text):
+    """Reference matcher: the value of each phrase at each position it occurs."""
+    if not isinstance(phrases, dict):
+        phrases = {phrase: phrase for phrase in phrases}
+    return Counter(
+        value
+        for start in range(len(text))
+        for phrase, value in phrases.items()
+        if text.startswith(phrase, start)
+    )
+
+
+@pytest.mark.parametrize("backend", ["regex", "automaton"])
+@pytest.mark.parametrize("phrases", PHRASE_SETS)
+def test_phrase_matcher_yields_every_occurrence(monkeypatch, backend, phrases):
+    if backend == "regex":
+        monkeypatch.setattr(app_module, "ahocorasick", None)
+    elif app_module.ahocorasick is None:
+        pytest.skip("pyahocorasick is not installed")
+    match = app_module._compile_phrases(phrases)
+    for text in TEXTS:
+        assert Counter(match(text)) == every_occurrence(phrases, text)
+
+
+# Every three-decimal tie in [-1, 1] plus random values
+POLARITIES = np.concatenate(
+    [
+        (np.arange(-20000, 20001) + 0.5) / 20000,
+        np.random.default_rng(0).uniform(-1, 1, 10000),
+        [0.0, -0.0, 1.0, -1.0, 0.9765, -0.0005],
+    ]
+)
+
+
+def test_round_polarity_batch_matches_round():
+    assert round_polarity_batch(POLARITIES).tolist() == [round(p, 3) for p in POLARITIES.tolist()]
+
+
+def test_get_confidence_batch_matches_get_confidence():
+    assert get_confidence_batch(POLARITIES).tolist() == [get_confidence(p) for p in POLARITIES.tolist()]
+
+
+def test_msgpack_response_matches_json():
+    msgpack = pytest.importorskip("msgpack")
+    if app_module.msgpack is None:
+        pytest.skip("app was imported without msgpack")
+    client = app.test_client()
+    # An off-topic review is answered without TextBlob's aspect scoring
+    body = {"text": "the weather is lovely today", "enforce_smartwatch": True}
+
+    as_json = client.post("/api/analyze-review", json=body, headers={"Accept": "application/json"})
+    as_msgpack = client.post("/api/analyze-review", json=body, headers={"Accept": "application/msgpack"})
+    assert as_json.mimetype == "application/json"
+    assert as_msgpack.mimetype == "application/msgpack"
+    assert msgpack.unpackb(as_msgpack.data) == as_json.get_json()
+
+    res = client.get("/api/health", headers={"Accept": "application/json;q=0.5, application/msgpack"})
+    assert msgpack.unpackb(res.data) == {"status": "ok"}
+
+
+def test_score_column_matches_the_scalar_helpers():
+    import pandas as pd
+
+    column = pd.Series(
+        ["my watch battery drains fast", "the weather is nice", None, "  ", "love this smartwatch"],
+        dtype="string",
+    )
+    valid = (column.notna() & column.str.strip().ne("")).fillna(False).to_numpy(dtype=bool)
+    expected = []
+    for text in column.tolist():
+        if pd.isna(text) or not text.strip():
+            expected.append({"review": None, **_BATCH_EMPTY_ROW})
+        elif not is_smartwatch_related(text):
+            expected.append({"review": text, **_BATCH_IRRELEVANT_ROW})
+        else:
+            sentiment, polarity = get_sentiment(text)
+            expected.append(
+                {
+                    "review": text,
+                    "sentiment": sentiment,
+                    "polarity": round(polarity, 3),
+                    "confidence": get_confidence(polarity),
+                    "relevant": "Yes",
+                }
+            )
+
+    rows, sentiments, polys = _score_column(column, valid, "Yes", _BATCH_IRRELEVANT_ROW, _BATCH_EMPTY_ROW)
+    assert rows == expected
+    scored = [row for row in expected if row["relevant"] == "Yes"]
+    assert sentiments == [row["sentiment"] for row in scored]
+    assert polys == [row["polarity"] for row in scored]
+
+    rows, _, _ = _score_column(column, valid, "Yes", _BATCH_IRRELEVANT_ROW, _BATCH_EMPTY_ROW, limit=2)
+    assert rows == expected[:2]
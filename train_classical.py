@@ -1,22 +1,93 @@
 """
-Train a classical sentiment classifier (TF‑IDF + Logistic Regression)
-on smartwatch reviews.
+Train a classical sentiment classifier (hashed TF‑IDF + Logistic Regression)
+on smartwatch reviews. Large training sets are fitted out of core with an
+SGD classifier on the same logistic loss.
 
 Run from project root:
     python scripts/train_classical.py
 """
 
 import joblib
+import numpy as np
 import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
+import scipy.sparse as sp
+from joblib import Parallel, delayed
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.linear_model import LogisticRegression, SGDClassifier
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 from sklearn.model_selection import train_test_split
+from sklearn.pipeline import Pipeline
+from sklearn.utils.class_weight import compute_class_weight
 
 
 DATA_PATH = "data/smartwatch_labeled.csv"
 MODEL_PATH = "classical_model.pkl"
 VECT_PATH = "tfidf_vectorizer.pkl"
+N_FEATURES = 2**18
+HASH_CHUNKS = 8
+# Training sets at least this large are fed to an SGD classifier chunk by
+# chunk instead of building the whole TF-IDF matrix for Logistic Regression
+SGD_MIN_ROWS = 200_000
+SGD_CHUNKSIZE = 50_000
+SGD_EPOCHS = 5
+
+
+def hash_texts(hasher, texts):
+    """
+    HashingVectorizer is stateless, so the texts are hashed in chunks on
+    all cores and the sparse rows stacked back together in order.
+    """
+    chunks = [c for c in np.array_split(np.asarray(texts, dtype=object), HASH_CHUNKS) if len(c)]
+    parts = Parallel(n_jobs=-1)(delayed(hasher.transform)(chunk) for chunk in chunks)
+    return sp.vstack(parts).tocsr()
+
+
+def iter_tfidf_chunks(hasher, tfidf, texts):
+    """Yield the TF-IDF rows of texts one SGD_CHUNKSIZE chunk at a time."""
+    for start in range(0, len(texts), SGD_CHUNKSIZE):
+        yield tfidf.transform(hash_texts(hasher, texts[start:start + SGD_CHUNKSIZE]))
+
+
+def fit_tfidf_streaming(hasher, texts):
+    """
+    TfidfTransformer fitted from document frequencies summed chunk by
+    chunk; gives the same idf_ as fitting on the full count matrix.
+    """
+    doc_freq = np.zeros(N_FEATURES, dtype=np.int64)
+    for start in range(0, len(texts), SGD_CHUNKSIZE):
+        counts = hash_texts(hasher, texts[start:start + SGD_CHUNKSIZE])
+        doc_freq += np.bincount(counts.indices, minlength=N_FEATURES)
+    tfidf = TfidfTransformer()
+    tfidf.idf_ = np.log((1 + len(texts)) / (1 + doc_freq)) + 1
+    return tfidf
+
+
+def train_sgd_streaming(hasher, X_train, y_train):
+    """
+    Logistic-loss SGD trained with partial_fit over shuffled chunks, so only
+    one chunk of the TF-IDF matrix is held in memory at a time.
+    Returns (tfidf, clf).
+    """
+    texts = np.asarray(X_train, dtype=object)
+    labels = np.asarray(y_train)
+    tfidf = fit_tfidf_streaming(hasher, texts)
+
+    # partial_fit has no class_weight="balanced", so compute the same weights up front
+    classes = np.unique(labels)
+    weights = compute_class_weight("balanced", classes=classes, y=labels)
+    clf = SGDClassifier(
+        loss="log_loss", class_weight=dict(zip(classes, weights)), n_jobs=-1, random_state=42
+    )
+
+    rng = np.random.default_rng(42)
+    for epoch in range(SGD_EPOCHS):
+        order = rng.permutation(len(texts))
+        for start in range(0, len(order), SGD_CHUNKSIZE):
+            idx = order[start:start + SGD_CHUNKSIZE]
+            X_chunk = tfidf.transform(hash_texts(hasher, texts[idx]))
+            clf.partial_fit(X_chunk, labels[idx], classes=classes)
+        print(f"SGD epoch {epoch + 1}/{SGD_EPOCHS} done")
+    return tfidf, clf
 
 
 def main():
@@ -31,23 +102,34 @@ def main():
         X, y, test_size=0.2, stratify=y, random_state=42
     )
 
-    tfidf = TfidfVectorizer(ngram_range=(1, 2), max_features=15000)
-    X_train_vec = tfidf.fit_transform(X_train)
-    X_test_vec = tfidf.transform(X_test)
-
-    clf = LogisticRegression(max_iter=2000, class_weight="balanced")
-    clf.fit(X_train_vec, y_train)
+    # Hashed uni/bigram counts re-weighted by TF-IDF; no vocabulary dict to build
+    hasher = HashingVectorizer(n_features=N_FEATURES, ngram_range=(1, 2), alternate_sign=False)
+    if len(X_train) >= SGD_MIN_ROWS:
+        tfidf, clf = train_sgd_streaming(hasher, X_train, y_train)
+        X_test_text = np.asarray(X_test, dtype=object)
+        y_pred = np.concatenate([clf.predict(X) for X in iter_tfidf_chunks(hasher, tfidf, X_test_text)])
+        model_name = "SGD Logistic Regression"
+    else:
+        tfidf = TfidfTransformer()
+        X_train_vec = tfidf.fit_transform(hash_texts(hasher, X_train))
+        X_test_vec = tfidf.transform(hash_texts(hasher, X_test))
+
+        clf = LogisticRegression(solver="saga", tol=1e-3, max_iter=2000, class_weight="balanced")
+        clf.fit(X_train_vec, y_train)
+        y_pred = clf.predict(X_test_vec)
+        model_name = "Logistic Regression"
+    vectorizer = Pipeline([("hash", hasher), ("tfidf", tfidf)])
 
-    y_pred = clf.predict(X_test_vec)
     acc = accuracy_score(y_test, y_pred)
 
-    print("\n=== Classical Model: TF‑IDF + Logistic Regression ===")
+    print(f"\n=== Classical Model: TF‑IDF + {model_name} ===")
     print(f"Accuracy: {acc:.4f} ({acc*100:.2f}%)")
     print("\nClassification report:\n", classification_report(y_test, y_pred))
     print("\nConfusion matrix:\n", confusion_matrix(y_test, y_pred))
 
-    joblib.dump(clf, MODEL_PATH)
-    joblib.dump(tfidf, VECT_PATH)
+    joblib.dump(clf, MODEL_PATH, compress=3)
+    # Saved as a hash + TF-IDF pipeline; compare_models.py calls .transform on it as before
+    joblib.dump(vectorizer, VECT_PATH, compress=3)
     print(f"\nSaved model to {MODEL_PATH}")
     print(f"Saved vectorizer to {VECT_PATH}")
 
@@ -10,12 +10,14 @@ import os
 
 import numpy as np
 import pandas as pd
+import torch
 from datasets import Dataset
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 from sklearn.model_selection import train_test_split
 from transformers import (
     AutoModelForSequenceClassification,
     AutoTokenizer,
+    DataCollatorWithPadding,
     Trainer,
     TrainingArguments,
 )
@@ -69,10 +71,11 @@ def main():
 
     tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
 
+    # No padding here: DataCollatorWithPadding pads each batch to its own
+    # longest review instead of every review to 256 tokens
     def tokenize_batch(batch):
         return tokenizer(
             batch["text"],
-            padding="max_length",
             truncation=True,
             max_length=256,
         )
@@ -100,9 +103,13 @@ def main():
         label2id=label2id,
     )
 
+    # Mixed precision on GPU: bf16 where supported (Ampere+), fp16 otherwise
+    use_bf16 = torch.cuda.is_available() and torch.cuda.is_bf16_supported()
+    use_fp16 = torch.cuda.is_available() and not use_bf16
+
     args = TrainingArguments(
         output_dir="models/transformer_checkpoints",
-        evaluation_strategy="epoch",
+        eval_strategy="epoch",
         save_strategy="epoch",
         learning_rate=2e-5,
         per_device_train_batch_size=8,
@@ -112,6 +119,9 @@ def main():
         logging_steps=50,
         load_best_model_at_end=True,
         metric_for_best_model="accuracy",
+        group_by_length=True,
+        fp16=use_fp16,
+        bf16=use_bf16,
     )
 
     trainer = Trainer(
@@ -120,6 +130,7 @@ def main():
         train_dataset=train_ds,
         eval_dataset=test_ds,
         tokenizer=tokenizer,
+        data_collator=DataCollatorWithPadding(tokenizer, pad_to_multiple_of=8),
         compute_metrics=compute_metrics,
     )
 
@@ -127,6 +138,9 @@ def main():
     trainer.train()
 
     print("\nEvaluating on held-out test set...")
+    # With group_by_length the Trainer also evaluates through a shuffled
+    # length-grouped sampler; predict in dataset order so preds line up with y_test
+    trainer.args.group_by_length = False
     predictions = trainer.predict(test_ds)
     preds = np.argmax(predictions.predictions, axis=-1)
     acc = accuracy_score(y_test, preds)